@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Glossary Linker Benchmark
+Synthesizes doc trees of configurable size and benchmarks bulk-link-glossary.py.
+
+Times load_glossary_terms, scan_markdown_file and generate_report separately,
+records peak memory per phase, and checks the generated linking-report.md
+against a golden copy so optimizations cannot silently change results.
+
+Usage:
+    python3 scripts/bench-glossary-linker.py
+    python3 scripts/bench-glossary-linker.py --pages 2000 --terms 200 --repeat 3
+    python3 scripts/bench-glossary-linker.py --check-golden
+    python3 scripts/bench-glossary-linker.py --update-golden
+    python3 scripts/bench-glossary-linker.py --candidate path/to/faster-linker.py
+"""
+
+import argparse
+import difflib
+import importlib.util
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Configuration
+SCRIPTS_DIR = Path(__file__).resolve().parent
+LINKER_SCRIPT = SCRIPTS_DIR / "bulk-link-glossary.py"
+GOLDEN_REPORT = SCRIPTS_DIR / "golden" / "linking-report.md"
+
+# Corpus used for the golden report - changing these invalidates the golden file
+GOLDEN_CORPUS = {'pages': 40, 'terms': 30, 'fences': 2, 'links': 3, 'seed': 42}
+
+ACRONYM_TERMS = [
+    ("ADR", "Architecture Decision Record"),
+    ("TDD", "Test-Driven Development"),
+    ("BDD", "Behavior-Driven Development"),
+    ("CI", "Continuous Integration"),
+    ("SLA", "Service Level Agreement"),
+    ("RBAC", "Role-Based Access Control"),
+    ("ORM", "Object-Relational Mapping"),
+    ("SSO", "Single Sign-On"),
+    ("DDD", "Domain-Driven Design"),
+    ("MVP", "Minimum Viable Product"),
+    ("SPA", "Single-Page Application"),
+    ("IaC", "Infrastructure as Code"),
+]
+
+PLAIN_TERMS = [
+    "Living Docs", "Brownfield", "Greenfield", "Increment", "Acceptance Criteria",
+    "User Story", "Feature Flag", "Test Pyramid", "Microservices", "Kubernetes",
+    "Docker", "Terraform", "Webhook", "Monorepo", "Observability", "Idempotency",
+    "Event Sourcing", "Rate Limiting", "Circuit Breaker", "Blue-Green Deployment",
+]
+
+FILLER_WORDS = [
+    "the", "team", "uses", "a", "workflow", "for", "each", "release", "and",
+    "reviews", "changes", "before", "merging", "into", "main", "with", "clear",
+    "ownership", "of", "every", "service", "so", "that", "docs", "stay", "current",
+]
+
+# Corpus synthesis
+def make_term_catalog(count, rng):
+    """Build (term_id, title) pairs, recycling the base lists with numeric suffixes."""
+    catalog = []
+    base = [(a.lower(), f"{a} ({full})") for a, full in ACRONYM_TERMS]
+    base += [(name.lower().replace(' ', '-'), name) for name in PLAIN_TERMS]
+    rng.shuffle(base)
+
+    for i in range(count):
+        term_id, title = base[i % len(base)]
+        if i >= len(base):
+            suffix = i // len(base) + 1
+            term_id = f"{term_id}-v{suffix}"
+            title = f"{title} v{suffix}"
+        catalog.append((term_id, title))
+
+    return catalog
+
+def mention_for(term_id, title, rng):
+    """Pick one of the surface forms the linker is expected to detect."""
+    forms = [title]
+    if '(' in title:
+        acronym, full = title.split(' (', 1)
+        forms = [acronym, full.rstrip(')')]
+    forms.append(term_id.replace('-', ' '))
+    return rng.choice(forms)
+
+def make_page(catalog, rng, fences, links, sentences=30):
+    """Generate one markdown page with term mentions, code fences and links."""
+    lines = [f"# {rng.choice(FILLER_WORDS).title()} {rng.choice(FILLER_WORDS).title()} Guide", ""]
+
+    for _ in range(sentences):
+        words = rng.sample(FILLER_WORDS, 8)
+        term_id, title = rng.choice(catalog)
+        words.insert(rng.randrange(len(words)), mention_for(term_id, title, rng))
+        lines.append(' '.join(words).capitalize() + '.')
+        lines.append("")
+
+    for _ in range(links):
+        term_id, title = rng.choice(catalog)
+        pos = rng.randrange(len(lines))
+        lines.insert(pos, f"See [{title}](/docs/glossary/terms/{term_id}) for details.")
+
+    for _ in range(fences):
+        term_id, title = rng.choice(catalog)
+        pos = rng.randrange(len(lines))
+        lines[pos:pos] = ["```bash", f"# {mention_for(term_id, title, rng)} example", "npm run build", "```"]
+
+    return '\n'.join(lines) + '\n'
+
+def synthesize_corpus(root, pages, terms, fences, links, seed):
+    """Write a deterministic docs tree (glossary + pages) under root."""
+    rng = random.Random(seed)
+    glossary_dir = root / "glossary" / "terms"
+    glossary_dir.mkdir(parents=True, exist_ok=True)
+
+    catalog = make_term_catalog(terms, rng)
+    for term_id, title in catalog:
+        (glossary_dir / f"{term_id}.md").write_text(
+            f"# {title}\n\n**{title}** is a synthetic glossary entry.\n", encoding='utf-8'
+        )
+
+    sections = ["guides", "learn", "overview", "integrations"]
+    for i in range(pages):
+        section = root / sections[i % len(sections)]
+        section.mkdir(parents=True, exist_ok=True)
+        (section / f"page-{i:05d}.md").write_text(
+            make_page(catalog, rng, fences, links), encoding='utf-8'
+        )
+
+    return catalog
+
+# Linker loading
+def load_linker(script_path, docs_root):
+    """Import a linker script by path and point its globals at docs_root."""
+    module_name = script_path.stem.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    module.DOCS_ROOT = docs_root
+    module.GLOSSARY_DIR = docs_root / "glossary" / "terms"
+    module.OUTPUT_REPORT = docs_root / "scripts" / "linking-report.md"
+    return module
+
+def measure(fn, *args, trace_memory=False):
+    """Run fn once, returning (result, seconds, peak_bytes).
+
+    tracemalloc slows allocation-heavy code considerably, so timing runs and
+    memory runs are kept separate.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def collect_markdown_files(linker):
+    """Mirror main()'s file selection, in a stable order."""
+    files = []
+    for md_file in sorted(linker.DOCS_ROOT.rglob("*.md")):
+        if linker.GLOSSARY_DIR in md_file.parents:
+            continue
+        if 'scripts' in md_file.parts:
+            continue
+        files.append(md_file)
+    return files
+
+def scan_all(linker, files, glossary_terms):
+    """Scan every file the way main() does."""
+    scan_results = {}
+    for md_file in files:
+        linkable, already_linked = linker.scan_markdown_file(md_file, glossary_terms)
+        scan_results[md_file] = {
+            'linkable': dict(linkable),
+            'already_linked': already_linked
+        }
+    return scan_results
+
+def run_pipeline(linker, trace_memory=False):
+    """Run load/scan/report once and return (report, timings, peak memory) per phase."""
+    files = collect_markdown_files(linker)
+    phases = {}
+    peaks = {}
+
+    glossary_terms, phases['load_glossary_terms'], peaks['load_glossary_terms'] = measure(
+        linker.load_glossary_terms, trace_memory=trace_memory)
+    scan_results, phases['scan_markdown_file'], peaks['scan_markdown_file'] = measure(
+        scan_all, linker, files, glossary_terms, trace_memory=trace_memory)
+    report, phases['generate_report'], peaks['generate_report'] = measure(
+        linker.generate_report, scan_results, glossary_terms, trace_memory=trace_memory)
+
+    return normalize_report(report), phases, peaks
+
+def normalize_report(report):
+    """Drop machine-specific paths so reports are comparable across runs."""
+    return report.replace(f"**Generated:** {Path.cwd()}", "**Generated:** <cwd>")
+
+# Reporting
+def format_bytes(size):
+    """Human-readable byte count."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def print_timings(label, runs, peaks):
+    """Print best/mean time and peak memory for each phase."""
+    print(f"\n⏱️  {label}")
+    print(f"   {'Phase':<22} {'Best':>10} {'Mean':>10} {'Peak mem':>12}")
+    print("   " + "-" * 56)
+    for phase in runs[0]:
+        samples = [run[phase] for run in runs]
+        best = min(samples) * 1000
+        mean = sum(samples) / len(samples) * 1000
+        print(f"   {phase:<22} {best:>8.1f}ms {mean:>8.1f}ms {format_bytes(peaks[phase]):>12}")
+
+def diff_reports(expected, actual, expected_label, actual_label):
+    """Return a unified diff (first 40 lines) between two reports."""
+    diff = difflib.unified_diff(
+        expected.splitlines(), actual.splitlines(),
+        fromfile=expected_label, tofile=actual_label, lineterm=''
+    )
+    return '\n'.join(list(diff)[:40])
+
+def bench(script_path, docs_root, repeat):
+    """Benchmark one linker implementation, returning its report."""
+    linker = load_linker(script_path, docs_root)
+    runs = []
+    report = None
+
+    for _ in range(repeat):
+        report, phases, _ = run_pipeline(linker)
+        runs.append(phases)
+
+    # One extra traced run for peak memory
+    _, _, peaks = run_pipeline(linker, trace_memory=True)
+
+    print_timings(script_path.name, runs, peaks)
+    return report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark bulk-link-glossary.py on a synthetic docs tree')
+    parser.add_argument('--pages', type=int, default=200, help='Markdown pages to generate (default: 200)')
+    parser.add_argument('--terms', type=int, default=50, help='Glossary terms to generate (default: 50)')
+    parser.add_argument('--fences', type=int, default=2, help='Code fences per page (default: 2)')
+    parser.add_argument('--links', type=int, default=3, help='Existing glossary links per page (default: 3)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed runs per implementation (default: 1)')
+    parser.add_argument('--linker', type=Path, default=LINKER_SCRIPT, help='Reference linker script')
+    parser.add_argument('--candidate', type=Path, help='Alternative linker that must produce an identical report')
+    parser.add_argument('--check-golden', action='store_true', help='Compare against the golden report (golden corpus)')
+    parser.add_argument('--update-golden', action='store_true', help='Rewrite the golden report (golden corpus)')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated corpus directory')
+    return parser.parse_args()
+
+def main():
+    """Main execution."""
+    args = parse_args()
+    use_golden = args.check_golden or args.update_golden
+    corpus = GOLDEN_CORPUS if use_golden else {
+        'pages': args.pages, 'terms': args.terms, 'fences': args.fences,
+        'links': args.links, 'seed': args.seed,
+    }
+
+    print("🏁 Glossary Linker Benchmark")
+    print("=" * 60)
+
+    docs_root = Path(tempfile.mkdtemp(prefix="glossary-bench-"))
+    failed = False
+
+    try:
+        print(f"\n🏗️  Synthesizing corpus: {corpus['pages']} pages, {corpus['terms']} terms, "
+              f"{corpus['fences']} fences/page, {corpus['links']} links/page (seed {corpus['seed']})")
+        synthesize_corpus(docs_root, **corpus)
+
+        report = bench(args.linker, docs_root, args.repeat)
+
+        if args.candidate:
+            candidate_report = bench(args.candidate, docs_root, args.repeat)
+            if candidate_report != report:
+                failed = True
+                print("\n❌ Candidate report differs from reference:")
+                print(diff_reports(report, candidate_report, args.linker.name, args.candidate.name))
+            else:
+                print("\n✅ Candidate report identical to reference")
+
+        if args.update_golden:
+            GOLDEN_REPORT.parent.mkdir(parents=True, exist_ok=True)
+            GOLDEN_REPORT.write_text(report, encoding='utf-8')
+            print(f"\n📝 Golden report updated: {GOLDEN_REPORT}")
+        elif args.check_golden:
+            if not GOLDEN_REPORT.exists():
+                failed = True
+                print(f"\n❌ Golden report missing: {GOLDEN_REPORT} (run with --update-golden)")
+            elif GOLDEN_REPORT.read_text(encoding='utf-8') != report:
+                failed = True
+                print("\n❌ Report differs from golden:")
+                print(diff_reports(GOLDEN_REPORT.read_text(encoding='utf-8'), report, "golden", args.linker.name))
+            else:
+                print("\n✅ Report matches golden")
+    finally:
+        if args.keep:
+            print(f"\n📁 Corpus kept at: {docs_root}")
+        else:
+            shutil.rmtree(docs_root, ignore_errors=True)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,91 @@
 #!/usr/bin/env python3
 """
 Analyze SpecWeave skills for duplicates and overlaps.
+
+Usage: python3 analyze-skills.py
+       python3 analyze-skills.py --engine numpy
+       python3 analyze-skills.py --no-cache --workers 8
+       python3 analyze-skills.py --budget skill-budget.json
+       python3 analyze-skills.py --index .specweave/cache/skill-index.sqlite
+       python3 analyze-skills.py --index .specweave/cache/skill-index.sqlite --overlaps-for increment-planner
+       python3 analyze-skills.py --similarity tfidf
+       python3 analyze-skills.py --similarity minhash --check path/to/new/SKILL.md
 """
+import argparse
+import hashlib
+import json
+import math
 import os
+import random
 import re
+import sqlite3
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
 
-def extract_yaml_frontmatter(file_path: str) -> Dict[str, str]:
-    """Extract YAML frontmatter from SKILL.md file."""
+try:
+    import numpy as np
+except ImportError:  # Optional: only needed for --engine numpy
+    np = None
+
+# "Activates for ..." with or without a colon, up to the end of the sentence
+ACTIVATION_RE = re.compile(r'(?:Activates for|Keywords)\s*:?\s*(.+?)(?:\.\s|\.?$)', re.IGNORECASE)
+
+# Every plugin's skills and agents (run from the repo root)
+SKILL_GLOBS = ['plugins/*/skills/*/SKILL.md', 'plugins/*/agents/*/AGENT.md']
+FRONTMATTER_CACHE = Path('.specweave/cache/skill-frontmatter.json')
+CACHE_VERSION = 1
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+SKILL_INDEX_VERSION = 1
+
+# 3+ shared keywords = potential duplicate
+MIN_SHARED_KEYWORDS = 3
+
+# Semantic similarity (full SKILL.md bodies)
+SIMILARITY_THRESHOLD = 0.5
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 32          # 32 bands x 4 rows -> LSH threshold ~0.42
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 61) - 1
+MINHASH_SEED = 1
+
+# Context budget: BPE-style approximation. Common words up to 8 chars are one
+# token; longer words cost one more token per 6 chars (~4 chars/token on prose)
+WORD_TOKEN_CHARS = 8
+EXTRA_TOKEN_CHARS = 6
+TOKEN_PIECE_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do for from has have if in into is it its of on or
+that the their then this to use used uses using when which will with you your
+""".split())
+
+def read_frontmatter_block(file_path: str) -> Optional[str]:
+    """Read only the YAML frontmatter lines, stopping at the closing --- marker."""
+    lines = []
     with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+        for line in f:
+            if not lines and not line.strip():
+                continue  # Leading blank lines before the opening marker
+            if not lines:
+                if line.rstrip() != '---':
+                    return None
+                lines.append(line)
+                continue
+            if line.rstrip() == '---':
+                return ''.join(lines[1:])
+            lines.append(line)
+    return None
 
-    # Extract YAML between --- markers
-    match = re.search(r'^---\s*\n(.*?)\n---', content, re.DOTALL | re.MULTILINE)
-    if not match:
+def extract_yaml_frontmatter(file_path: str) -> Dict[str, str]:
+    """Extract YAML frontmatter from SKILL.md file."""
+    yaml_content = read_frontmatter_block(file_path)
+    if yaml_content is None:
         return {}
 
-    yaml_content = match.group(1)
-
     # Parse name and description
     name_match = re.search(r'^name:\s*(.+)$', yaml_content, re.MULTILINE)
     desc_match = re.search(r'^description:\s*(.+)$', yaml_content, re.MULTILINE)
@@ -29,6 +96,55 @@ def extract_yaml_frontmatter(file_path: str) -> Dict[str, str]:
         'file': file_path
     }
 
+def find_skill_files(root: Path = Path('.')) -> List[str]:
+    """All SKILL.md and AGENT.md files across every plugin, in stable order."""
+    files = set()
+    for pattern in SKILL_GLOBS:
+        files.update(str(p) for p in root.glob(pattern))
+    return sorted(files)
+
+def load_frontmatter_cache(cache_path: Path) -> Dict[str, Dict]:
+    """Load cached frontmatter keyed by file path (empty on miss or corruption)."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+def save_frontmatter_cache(cache_path: Path, entries: Dict[str, Dict]) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'entries': entries}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+def collect_skill_metadata(files: List[str], cache_path: Optional[Path] = FRONTMATTER_CACHE,
+                           workers: int = DEFAULT_WORKERS) -> Tuple[List[Dict], int]:
+    """Parse frontmatter for every file in a thread pool, reusing cached entries.
+
+    Cache entries are keyed by path and validated by (mtime_ns, size), so
+    repeated runs only re-read files that changed. Returns (metadata, hits).
+    """
+    cached = load_frontmatter_cache(cache_path).get('entries', {}) if cache_path else {}
+
+    def load(file_path: str) -> Tuple[str, Dict, bool]:
+        stat = os.stat(file_path)
+        entry = cached.get(file_path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return file_path, entry, True
+        metadata = extract_yaml_frontmatter(file_path)
+        return file_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'metadata': metadata}, False
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(load, files))
+
+    if cache_path:
+        save_frontmatter_cache(cache_path, {path: entry for path, entry, _ in results})
+
+    skills = [dict(entry['metadata']) for _, entry, _ in results if entry['metadata']]
+    return skills, sum(1 for _, _, hit in results if hit)
+
 def extract_keywords(description: str) -> Set[str]:
     """Extract activation keywords from description."""
     # Common patterns for keywords
@@ -58,19 +174,468 @@ def extract_keywords(description: str) -> Set[str]:
 
     return keywords
 
+def extract_activation_phrases(description: str) -> Set[str]:
+    """Comma-separated trigger phrases following "Activates for" / "Keywords:"."""
+    phrases = set()
+    for match in ACTIVATION_RE.finditer(description):
+        for phrase in match.group(1).split(','):
+            phrase = phrase.strip().strip('"\'').lower()
+            if len(phrase) > 1:
+                phrases.add(phrase)
+    return phrases
+
+def build_keyword_index(skills: List[Dict]) -> Dict[str, int]:
+    """Build inverted index: keyword -> bitset of skill positions (bit i = skills[i])."""
+    index: Dict[str, int] = {}
+    for i, skill in enumerate(skills):
+        bit = 1 << i
+        for keyword in skill['keywords']:
+            index[keyword] = index.get(keyword, 0) | bit
+    return index
+
+def find_overlaps_indexed(skills: List[Dict], min_shared: int = MIN_SHARED_KEYWORDS) -> List[Tuple[int, int, Set[str]]]:
+    """Find skill pairs sharing min_shared+ keywords via the inverted index.
+
+    Only pairs that share at least one keyword are ever compared, so cost
+    scales with actual overlap instead of n².
+    """
+    index = build_keyword_index(skills)
+    pairs = []
+
+    for i, skill in enumerate(skills):
+        if len(skill['keywords']) < min_shared:
+            continue
+
+        # Union of all skills sharing any keyword, restricted to j > i
+        candidates = 0
+        for keyword in skill['keywords']:
+            candidates |= index[keyword]
+        candidates &= ~((1 << (i + 1)) - 1)
+
+        # Walk set bits lowest-first so pairs come out in (i, j) order
+        while candidates:
+            lowest = candidates & -candidates
+            j = lowest.bit_length() - 1
+            candidates ^= lowest
+            shared = skill['keywords'] & skills[j]['keywords']
+            if len(shared) >= min_shared:
+                pairs.append((i, j, shared))
+
+    return pairs
+
+def find_overlaps_vectorized(skills: List[Dict], min_shared: int = MIN_SHARED_KEYWORDS) -> List[Tuple[int, int, Set[str]]]:
+    """Find skill pairs sharing min_shared+ keywords with one boolean-matrix product.
+
+    Builds a skills x keywords incidence matrix M; M @ M.T gives every
+    pairwise overlap count at once.
+    """
+    vocabulary = {kw: col for col, kw in enumerate(sorted(build_keyword_index(skills)))}
+    # float32 routes the product through BLAS; counts stay exact below 2**24
+    matrix = np.zeros((len(skills), len(vocabulary)), dtype=np.float32)
+    for row, skill in enumerate(skills):
+        matrix[row, [vocabulary[kw] for kw in skill['keywords']]] = 1
+
+    overlap_counts = np.triu(matrix @ matrix.T, k=1)
+
+    # argwhere yields row-major order, matching the i < j loop order
+    return [
+        (int(i), int(j), skills[i]['keywords'] & skills[j]['keywords'])
+        for i, j in np.argwhere(overlap_counts >= min_shared)
+    ]
+
+OVERLAP_ENGINES = {
+    'index': find_overlaps_indexed,
+    'numpy': find_overlaps_vectorized,
+}
+
+def read_skill_body(file_path: str) -> str:
+    """Read SKILL.md content without its YAML frontmatter."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return re.sub(r'\A---\s*\n.*?\n---\s*\n', '', content, count=1, flags=re.DOTALL)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in re.findall(r'[a-z][a-z0-9+#-]*', text.lower()) if t not in STOPWORDS]
+
+class TfidfIndex:
+    """Sparse TF-IDF vectors with a term -> postings inverted index.
+
+    Queries only touch postings for the query's own terms, so checking one
+    skill costs O(postings hit) rather than O(skills).
+    """
+
+    def __init__(self, docs: List[List[str]]):
+        doc_freq = Counter(term for tokens in docs for term in set(tokens))
+        self.idf = {term: math.log((1 + len(docs)) / (1 + df)) + 1 for term, df in doc_freq.items()}
+        self.vectors = [self.vectorize(tokens) for tokens in docs]
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc_id, vector in enumerate(self.vectors):
+            for term, weight in vector.items():
+                self.postings[term].append((doc_id, weight))
+
+    def vectorize(self, tokens: List[str]) -> Dict[str, float]:
+        """L2-normalized sublinear-tf TF-IDF vector (terms outside the corpus are dropped)."""
+        counts = Counter(t for t in tokens if t in self.idf)
+        vector = {t: (1 + math.log(c)) * self.idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {t: w / norm for t, w in vector.items()}
+
+    def query(self, vector: Dict[str, float], threshold: float) -> List[Tuple[int, float]]:
+        """Cosine similarity against every indexed doc sharing a term."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weight in vector.items():
+            for doc_id, doc_weight in self.postings.get(term, ()):
+                scores[doc_id] += weight * doc_weight
+        return sorted(((d, s) for d, s in scores.items() if s >= threshold), key=lambda x: -x[1])
+
+    def similar_pairs(self, threshold: float) -> List[Tuple[int, int, float]]:
+        pairs = []
+        for i, vector in enumerate(self.vectors):
+            pairs.extend((i, j, score) for j, score in self.query(vector, threshold) if j > i)
+        return pairs
+
+class MinHashLSH:
+    """MinHash signatures over word shingles, bucketed with LSH banding.
+
+    A query hashes its signature into MINHASH_BANDS buckets and only scores
+    skills that collide in at least one band, so lookup cost is independent
+    of marketplace size.
+    """
+
+    def __init__(self, docs: List[List[str]], num_perm: int = MINHASH_PERMUTATIONS, bands: int = MINHASH_BANDS):
+        self.rows = num_perm // bands
+        self.bands = bands
+        # a < 2**31 and 32-bit shingle hashes keep a*x+b inside uint64 for NumPy
+        rng = random.Random(MINHASH_SEED)
+        self.perms = [(rng.randrange(1, 1 << 31), rng.randrange(0, 1 << 31)) for _ in range(num_perm)]
+        self.signatures = [self.signature(tokens) for tokens in docs]
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        for doc_id, sig in enumerate(self.signatures):
+            for key in self.band_keys(sig):
+                self.buckets[key].append(doc_id)
+
+    def signature(self, tokens: List[str]) -> List[int]:
+        shingles = {' '.join(tokens[k:k + SHINGLE_SIZE]) for k in range(max(1, len(tokens) - SHINGLE_SIZE + 1))}
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), 'little') for s in shingles]
+        if np is not None:
+            a, b = (np.array(col, dtype=np.uint64) for col in zip(*self.perms))
+            h = np.array(hashes, dtype=np.uint64)
+            return ((a[:, None] * h[None, :] + b[:, None]) % np.uint64(MERSENNE_PRIME)).min(axis=1).tolist()
+        return [min((a * x + b) % MERSENNE_PRIME for x in hashes) for a, b in self.perms]
+
+    def band_keys(self, sig: List[int]):
+        for band in range(self.bands):
+            yield band, tuple(sig[band * self.rows:(band + 1) * self.rows])
+
+    def estimate(self, sig1: List[int], sig2: List[int]) -> float:
+        """Estimated Jaccard similarity of two shingle sets."""
+        return sum(1 for a, b in zip(sig1, sig2) if a == b) / len(sig1)
+
+    def query(self, sig: List[int], threshold: float) -> List[Tuple[int, float]]:
+        candidates = {doc_id for key in self.band_keys(sig) for doc_id in self.buckets.get(key, ())}
+        scored = ((d, self.estimate(sig, self.signatures[d])) for d in candidates)
+        return sorted(((d, s) for d, s in scored if s >= threshold), key=lambda x: -x[1])
+
+    def similar_pairs(self, threshold: float) -> List[Tuple[int, int, float]]:
+        pairs = []
+        for i, sig in enumerate(self.signatures):
+            pairs.extend((i, j, score) for j, score in self.query(sig, threshold) if j > i)
+        return pairs
+
+SIMILARITY_ENGINES = {
+    'tfidf': TfidfIndex,
+    'minhash': MinHashLSH,
+}
+
+def build_similarity_index(skills: List[Dict], method: str):
+    """Tokenize every skill body and build the requested similarity index."""
+    docs = [tokenize(read_skill_body(skill['file'])) for skill in skills]
+    return SIMILARITY_ENGINES[method](docs)
+
+def check_new_skill(index, skills: List[Dict], file_path: str, threshold: float) -> List[Tuple[int, float]]:
+    """Score one (possibly unindexed) SKILL.md against the whole index, except itself."""
+    tokens = tokenize(read_skill_body(file_path))
+    if isinstance(index, TfidfIndex):
+        matches = index.query(index.vectorize(tokens), threshold)
+    else:
+        matches = index.query(index.signature(tokens), threshold)
+    checked = os.path.realpath(file_path)
+    return [(doc_id, score) for doc_id, score in matches
+            if os.path.realpath(skills[doc_id]['file']) != checked]
+
+def estimate_tokens(text: str) -> int:
+    """Offline approximation of a BPE tokenizer's token count.
+
+    Splits like GPT-style pre-tokenizers (word, up to 3 digits, punctuation
+    run), then charges long words extra tokens.
+    """
+    total = 0
+    for piece in TOKEN_PIECE_RE.findall(text):
+        if piece.isalpha():
+            total += 1 + math.ceil(max(0, len(piece) - WORD_TOKEN_CHARS) / EXTRA_TOKEN_CHARS)
+        else:
+            total += 1
+    return total
+
+def plugin_name(file_path: str) -> str:
+    """plugins/<plugin>/... -> <plugin>."""
+    parts = Path(file_path).parts
+    return parts[parts.index('plugins') + 1] if 'plugins' in parts[:-1] else 'UNKNOWN'
+
+def build_budget_report(skills: List[Dict]) -> Dict:
+    """Token footprint of every skill's always-loaded metadata, per skill and per plugin."""
+    entries = []
+    for skill in skills:
+        # What the agent loads for every request: the name and description lines
+        tokens = estimate_tokens(f"name: {skill['name']}\ndescription: {skill['description']}")
+        keyword_count = len(skill['keywords'] | extract_activation_phrases(skill['description']))
+        entries.append({
+            'name': skill['name'],
+            'plugin': plugin_name(skill['file']),
+            'file': skill['file'],
+            'tokens': tokens,
+            'chars': len(skill['description']),
+            'keywords': keyword_count,
+            'tokens_per_keyword': round(tokens / keyword_count, 1) if keyword_count else None,
+        })
+
+    # Most expensive per keyword first; skills with no keywords are pure overhead
+    entries.sort(key=lambda e: (e['tokens_per_keyword'] is not None, -(e['tokens_per_keyword'] or e['tokens'])))
+
+    plugins: Dict[str, Dict] = {}
+    for entry in entries:
+        plugin = plugins.setdefault(entry['plugin'], {'skills': 0, 'tokens': 0})
+        plugin['skills'] += 1
+        plugin['tokens'] += entry['tokens']
+
+    return {
+        'tokenizer': 'offline BPE approximation',
+        'total_tokens': sum(e['tokens'] for e in entries),
+        'skills': entries,
+        'plugins': dict(sorted(plugins.items(), key=lambda kv: -kv[1]['tokens'])),
+    }
+
+def print_budget_report(report: Dict, top: int = 20) -> None:
+    print(f"CONTEXT BUDGET: {report['total_tokens']:,} tokens of skill metadata "
+          f"across {len(report['skills'])} skills ({report['tokenizer']})")
+    print("=" * 100)
+
+    print(f"\n{'Plugin':<40} {'Skills':>8} {'Tokens':>10}")
+    print("-" * 60)
+    for name, plugin in report['plugins'].items():
+        print(f"{name:<40} {plugin['skills']:>8} {plugin['tokens']:>10,}")
+
+    print(f"\nTOP {top} SKILLS BY COST PER KEYWORD")
+    print(f"{'Skill':<40} {'Tokens':>8} {'Keywords':>10} {'Tokens/kw':>10}")
+    print("-" * 72)
+    for entry in report['skills'][:top]:
+        per_kw = entry['tokens_per_keyword']
+        print(f"{entry['name']:<40} {entry['tokens']:>8} {entry['keywords']:>10} "
+              f"{per_kw if per_kw is not None else '-':>10}")
+
+SKILL_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS skills (
+    file TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    keywords TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS skills_name ON skills (name);
+CREATE TABLE IF NOT EXISTS skill_keywords (
+    keyword TEXT NOT NULL,
+    file TEXT NOT NULL,
+    PRIMARY KEY (keyword, file)
+);
+CREATE INDEX IF NOT EXISTS skill_keywords_file ON skill_keywords (file);
+CREATE TABLE IF NOT EXISTS overlaps (
+    file_a TEXT NOT NULL,
+    file_b TEXT NOT NULL,
+    shared TEXT NOT NULL,
+    shared_count INTEGER NOT NULL,
+    PRIMARY KEY (file_a, file_b)
+);
+CREATE INDEX IF NOT EXISTS overlaps_file_b ON overlaps (file_b);
+"""
+
+def skill_content_hash(skill: Dict) -> str:
+    """Hash of everything keywords are derived from."""
+    return hashlib.sha256(f"{skill['name']}\n{skill['description']}".encode('utf-8')).hexdigest()
+
+def open_skill_index(db_path: Path, min_shared: int) -> sqlite3.Connection:
+    """Open (or create) the skill index, wiping it if its settings changed."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(SKILL_INDEX_SCHEMA)
+    settings = json.dumps({'version': SKILL_INDEX_VERSION, 'min_shared': min_shared})
+    row = conn.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+    if row is None or row[0] != settings:
+        conn.executescript("DELETE FROM skills; DELETE FROM skill_keywords; DELETE FROM overlaps;")
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('settings', ?)", (settings,))
+        conn.commit()
+    return conn
+
+def update_skill_index(db_path: Path, skills: List[Dict], min_shared: int = MIN_SHARED_KEYWORDS) -> Dict[str, int]:
+    """Bring the persistent index in line with skills, touching only what changed.
+
+    Skills whose content hash is unchanged keep their rows and overlap
+    pairs; changed/new skills are re-inserted and their pairs recomputed via
+    the keyword table, and removed skills drop out with all their pairs.
+    """
+    conn = open_skill_index(db_path, min_shared)
+    with conn:
+        stored = dict(conn.execute("SELECT file, content_hash FROM skills"))
+        current = {skill['file']: skill for skill in skills}
+        hashes = {file: skill_content_hash(skill) for file, skill in current.items()}
+
+        removed = [f for f in stored if f not in current]
+        changed = [f for f in current if stored.get(f) != hashes[f]]
+
+        for file in removed + changed:
+            conn.execute("DELETE FROM skills WHERE file = ?", (file,))
+            conn.execute("DELETE FROM skill_keywords WHERE file = ?", (file,))
+            conn.execute("DELETE FROM overlaps WHERE file_a = ? OR file_b = ?", (file, file))
+
+        for file in changed:
+            skill = current[file]
+            conn.execute(
+                "INSERT INTO skills (file, name, content_hash, keywords) VALUES (?, ?, ?, ?)",
+                (file, skill['name'], hashes[file], json.dumps(sorted(skill['keywords']))))
+            conn.executemany(
+                "INSERT INTO skill_keywords (keyword, file) VALUES (?, ?)",
+                [(kw, file) for kw in skill['keywords']])
+
+        # Affected pairs: each changed skill against every skill sharing a keyword
+        for file in changed:
+            keywords = current[file]['keywords']
+            if len(keywords) < min_shared:
+                continue
+            placeholders = ','.join('?' * len(keywords))
+            candidates = conn.execute(
+                f"SELECT file, COUNT(*) FROM skill_keywords WHERE keyword IN ({placeholders}) "
+                f"AND file != ? GROUP BY file HAVING COUNT(*) >= ?",
+                (*keywords, file, min_shared))
+            for other, _ in candidates.fetchall():
+                shared = sorted(keywords & current[other]['keywords'])
+                file_a, file_b = sorted((file, other))
+                conn.execute(
+                    "INSERT OR REPLACE INTO overlaps (file_a, file_b, shared, shared_count) VALUES (?, ?, ?, ?)",
+                    (file_a, file_b, json.dumps(shared), len(shared)))
+
+        pairs = conn.execute("SELECT COUNT(*) FROM overlaps").fetchone()[0]
+    conn.close()
+    return {'skills': len(current), 'changed': len(changed), 'removed': len(removed), 'pairs': pairs}
+
+def query_skill_overlaps(db_path: Path, skill: str) -> List[Tuple[str, str, List[str]]]:
+    """Indexed lookup of precomputed overlaps for a skill name or file path.
+
+    Returns (name, file, shared keywords) for every overlapping skill.
+    """
+    conn = sqlite3.connect(str(db_path))
+    try:
+        files = [skill] if conn.execute("SELECT 1 FROM skills WHERE file = ?", (skill,)).fetchone() else \
+            [row[0] for row in conn.execute("SELECT file FROM skills WHERE name = ?", (skill,))]
+        results = []
+        for file in files:
+            rows = conn.execute(
+                "SELECT s.name, s.file, o.shared FROM overlaps o "
+                "JOIN skills s ON s.file = CASE WHEN o.file_a = ? THEN o.file_b ELSE o.file_a END "
+                "WHERE o.file_a = ? OR o.file_b = ? ORDER BY o.shared_count DESC, s.name",
+                (file, file, file))
+            results.extend((name, other, json.loads(shared)) for name, other, shared in rows)
+        return results
+    finally:
+        conn.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Analyze SpecWeave skills for duplicates and overlaps')
+    parser.add_argument('--engine', choices=sorted(OVERLAP_ENGINES), default='index',
+                        help='Duplicate detection engine (default: index)')
+    parser.add_argument('--min-shared', type=int, default=MIN_SHARED_KEYWORDS,
+                        help=f'Shared keywords that flag a potential duplicate (default: {MIN_SHARED_KEYWORDS})')
+    parser.add_argument('--similarity', choices=sorted(SIMILARITY_ENGINES),
+                        help='Also find near-duplicate skills by full SKILL.md content')
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD,
+                        help=f'Similarity score that flags a near-duplicate (default: {SIMILARITY_THRESHOLD})')
+    parser.add_argument('--check', metavar='SKILL_MD',
+                        help='Only check this SKILL.md against all skills (requires --similarity)')
+    parser.add_argument('--budget', metavar='JSON',
+                        help="Only report metadata token cost; write JSON budget to this path ('-' for stdout)")
+    parser.add_argument('--index', type=Path, metavar='SQLITE',
+                        help='Only update the persistent skill index (SQLite) incrementally')
+    parser.add_argument('--overlaps-for', metavar='SKILL',
+                        help='Query precomputed overlaps for a skill name or file (requires --index)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Threads used to parse frontmatter (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore and do not update {FRONTMATTER_CACHE}')
+    args = parser.parse_args()
+    if args.engine == 'numpy' and np is None:
+        parser.error("--engine numpy requires NumPy (pip install numpy)")
+    if args.check and not args.similarity:
+        parser.error("--check requires --similarity")
+    if args.overlaps_for and not args.index:
+        parser.error("--overlaps-for requires --index")
+    return args
+
 def main():
     """Main analysis function."""
-    skills_dir = Path('plugins/specweave/skills')
+    args = parse_args()
 
-    # Collect all skills
-    skills = []
-    for skill_file in skills_dir.glob('*/SKILL.md'):
-        metadata = extract_yaml_frontmatter(str(skill_file))
-        if metadata:
-            metadata['keywords'] = extract_keywords(metadata['description'])
-            skills.append(metadata)
+    if args.overlaps_for:
+        if not args.index.exists():
+            print(f"Skill index not found: {args.index} (run with --index first)")
+            sys.exit(1)
+        overlaps = query_skill_overlaps(args.index, args.overlaps_for)
+        print(f"{len(overlaps)} skills overlap with {args.overlaps_for}\n")
+        for name, file, shared in overlaps:
+            print(f"{name} ({file})")
+            print(f"  Shared keywords: {', '.join(shared)}")
+        return
 
-    print(f"Found {len(skills)} skills\n")
+    # Collect all skills and agents
+    skill_files = find_skill_files()
+    skills, cache_hits = collect_skill_metadata(
+        skill_files,
+        cache_path=None if args.no_cache else FRONTMATTER_CACHE,
+        workers=args.workers,
+    )
+    for metadata in skills:
+        metadata['keywords'] = extract_keywords(metadata['description'])
+
+    if args.index:
+        stats = update_skill_index(args.index, skills, args.min_shared)
+        print(f"Skill index updated: {args.index}")
+        print(f"  Skills: {stats['skills']} ({stats['changed']} changed, {stats['removed']} removed)")
+        print(f"  Overlap pairs: {stats['pairs']}")
+        return
+
+    if args.budget:
+        report = build_budget_report(skills)
+        if args.budget == '-':
+            print(json.dumps(report, indent=2))
+            return
+        with open(args.budget, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print_budget_report(report)
+        print(f"\nBudget report saved to: {args.budget}")
+        return
+
+    if args.check:
+        index = build_similarity_index(skills, args.similarity)
+        matches = check_new_skill(index, skills, args.check, args.threshold)
+        print(f"Checked {args.check} against {len(skills)} skills ({args.similarity})\n")
+        if not matches:
+            print(f"No skills at or above {args.threshold:.2f} similarity")
+        for doc_id, score in matches:
+            print(f"  {score:.2f}  {skills[doc_id]['name']} ({skills[doc_id]['file']})")
+        return
+
+    if args.no_cache:
+        print(f"Found {len(skills)} skills\n")
+    else:
+        print(f"Found {len(skills)} skills ({cache_hits}/{len(skill_files)} files unchanged since last run)\n")
     print("=" * 100)
 
     # Print all skills with their keywords
@@ -103,13 +668,23 @@ def main():
     print("=" * 100)
 
     # Find skills with high keyword overlap
-    for i, skill1 in enumerate(skills):
-        for skill2 in skills[i+1:]:
-            shared = skill1['keywords'] & skill2['keywords']
-            if len(shared) >= 3:  # 3+ shared keywords = potential duplicate
-                overlap_pct = len(shared) / max(len(skill1['keywords']), len(skill2['keywords'])) * 100
-                print(f"\n{skill1['name']} <-> {skill2['name']}")
-                print(f"  Shared keywords ({overlap_pct:.0f}%): {', '.join(sorted(shared))}")
+    for i, j, shared in OVERLAP_ENGINES[args.engine](skills, args.min_shared):
+        skill1, skill2 = skills[i], skills[j]
+        overlap_pct = len(shared) / max(len(skill1['keywords']), len(skill2['keywords'])) * 100
+        print(f"\n{skill1['file']} <-> {skill2['file']}")
+        print(f"  Shared keywords ({overlap_pct:.0f}%): {', '.join(sorted(shared))}")
+
+    if args.similarity:
+        print("\n" + "=" * 100)
+        print(f"\nSEMANTIC NEAR-DUPLICATES ({args.similarity}, threshold {args.threshold:.2f})")
+        print("=" * 100)
+
+        index = build_similarity_index(skills, args.similarity)
+        pairs = sorted(index.similar_pairs(args.threshold), key=lambda p: -p[2])
+        print(f"\nFound {len(pairs)} similar skill pairs:")
+        for i, j, score in pairs:
+            print(f"\n{skills[i]['file']} <-> {skills[j]['file']}")
+            print(f"  Similarity: {score:.2f}")
 
 if __name__ == '__main__':
     main()
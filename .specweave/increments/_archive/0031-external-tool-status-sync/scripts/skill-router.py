@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Simulate skill activation routing and benchmark its latency.
+
+Compiles every skill's activation phrases (from the "Activates for" /
+"Keywords:" part of its description) into one Aho-Corasick automaton, so a
+prompt is matched against the whole marketplace in a single pass.
+
+Usage: python3 skill-router.py --prompt "fix the kafka consumer lag"
+       python3 skill-router.py --bench
+       python3 skill-router.py --bench --prompts prompts.txt --top 20
+       python3 skill-router.py --bench --no-cache
+"""
+import argparse
+import importlib.util
+import random
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+# Skill metadata collection is shared with analyze-skills.py
+_spec = importlib.util.spec_from_file_location(
+    'analyze_skills', Path(__file__).resolve().parent / 'analyze-skills.py')
+analyze_skills = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(analyze_skills)
+
+DEFAULT_PROMPTS = 5000
+FILLER = ("can you help me", "please", "I need to", "quickly", "for our team",
+          "in the repo", "before the release", "and then", "again", "today")
+
+class ActivationAutomaton:
+    """Aho-Corasick automaton over activation phrases.
+
+    Node 0 is the root; each node has a goto dict, a failure link and the
+    phrases ending there. Matching is O(len(prompt) + matches) no matter how
+    many skills are installed.
+    """
+
+    def __init__(self, phrase_to_skills: Dict[str, Set[int]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[str]] = [[]]
+        self.phrase_to_skills = phrase_to_skills
+
+        for phrase in phrase_to_skills:
+            node = 0
+            for ch in phrase:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(phrase)
+
+        # BFS to set failure links and merge outputs along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def match(self, text: str) -> Set[str]:
+        """Phrases occurring in text on word boundaries."""
+        text = text.lower()
+        found = set()
+        node = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for end, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                after = text[end + 1:end + 2]
+                if after.isalnum():
+                    continue
+                for phrase in out[node]:
+                    start = end - len(phrase) + 1
+                    if start == 0 or not text[start - 1].isalnum():
+                        found.add(phrase)
+        return found
+
+class SkillRouter:
+    """Route prompts to the skills whose activation phrases they contain."""
+
+    def __init__(self, skills: List[Dict]):
+        self.skills = skills
+        phrase_to_skills: Dict[str, Set[int]] = {}
+        for i, skill in enumerate(skills):
+            for phrase in skill['activation']:
+                phrase_to_skills.setdefault(phrase, set()).add(i)
+        self.automaton = ActivationAutomaton(phrase_to_skills)
+        self.naive_patterns = [
+            [re.compile(r'(?<![a-z0-9])' + re.escape(p) + r'(?![a-z0-9])') for p in skill['activation']]
+            for skill in skills
+        ]
+
+    def route(self, prompt: str) -> List[Tuple[int, int]]:
+        """(skill index, distinct phrases matched), best first."""
+        scores: Dict[int, int] = {}
+        for phrase in self.automaton.match(prompt):
+            for i in self.automaton.phrase_to_skills[phrase]:
+                scores[i] = scores.get(i, 0) + 1
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+
+    def route_naive(self, prompt: str) -> List[Tuple[int, int]]:
+        """Reference router: one regex search per phrase per skill."""
+        text = prompt.lower()
+        scores = {}
+        for i, patterns in enumerate(self.naive_patterns):
+            hits = sum(1 for p in patterns if p.search(text))
+            if hits:
+                scores[i] = hits
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+
+def load_skills(workers: int, use_cache: bool = True) -> List[Dict]:
+    """All skills/agents that declare at least one activation phrase."""
+    skills, _ = analyze_skills.collect_skill_metadata(
+        analyze_skills.find_skill_files(),
+        cache_path=analyze_skills.FRONTMATTER_CACHE if use_cache else None,
+        workers=workers)
+    for skill in skills:
+        skill['activation'] = analyze_skills.extract_activation_phrases(skill['description'])
+    return [s for s in skills if s['activation']]
+
+def synthesize_prompts(skills: List[Dict], count: int, seed: int = 7) -> List[str]:
+    """Prompts mixing 0-2 activation phrases with filler text."""
+    rng = random.Random(seed)
+    phrases = [sorted(s['activation']) for s in skills]
+    prompts = []
+    for _ in range(count):
+        parts = rng.sample(FILLER, 3)
+        for _ in range(rng.choice([0, 1, 1, 1, 2])):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(rng.choice(phrases)))
+        prompts.append(' '.join(parts))
+    return prompts
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+def time_router(route, prompts: List[str]) -> Tuple[List[float], List[List[Tuple[int, int]]]]:
+    """Per-prompt latency in microseconds plus routing results."""
+    latencies, results = [], []
+    for prompt in prompts:
+        start = time.perf_counter_ns()
+        result = route(prompt)
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+        results.append(result)
+    return latencies, results
+
+def run_benchmark(router: SkillRouter, prompts: List[str], top: int) -> None:
+    print(f"Replaying {len(prompts)} prompts against {len(router.skills)} skills "
+          f"({len(router.automaton.phrase_to_skills)} phrases, {len(router.automaton.goto)} automaton states)\n")
+
+    print(f"{'Router':<12} {'p50 (us)':>10} {'p99 (us)':>10} {'max (us)':>10} {'prompts/s':>12}")
+    print("-" * 58)
+    results = None
+    for label, route in (('automaton', router.route), ('naive', router.route_naive)):
+        latencies, routed = time_router(route, prompts)
+        if results is None:
+            results = routed
+        elif routed != results:
+            print("WARNING: automaton and naive routers disagree")
+        ordered = sorted(latencies)
+        throughput = len(prompts) / (sum(latencies) / 1e6) if sum(latencies) else float('inf')
+        print(f"{label:<12} {percentile(ordered, 50):>10.1f} {percentile(ordered, 99):>10.1f} "
+              f"{ordered[-1]:>10.1f} {throughput:>12,.0f}")
+
+    activated = sum(1 for r in results if r)
+    ambiguous: Dict[Tuple[str, ...], int] = {}
+    for r in results:
+        if len(r) > 1 and r[0][1] == r[1][1]:
+            # File paths, not names: a skill and an agent can share a name
+            tied = tuple(sorted(router.skills[i]['file'] for i, score in r if score == r[0][1]))
+            ambiguous[tied] = ambiguous.get(tied, 0) + 1
+
+    print(f"\nActivated: {activated}/{len(prompts)} prompts")
+    print(f"Ambiguous (tied top score): {sum(ambiguous.values())} prompts\n")
+    if ambiguous:
+        print(f"TOP {top} AMBIGUOUS ACTIVATIONS")
+        print("=" * 100)
+        for tied, count in sorted(ambiguous.items(), key=lambda x: -x[1])[:top]:
+            print(f"{count:>6}  {', '.join(tied)}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Simulate and benchmark skill activation routing')
+    parser.add_argument('--prompt', help='Route a single prompt and print activated skills')
+    parser.add_argument('--bench', action='store_true', help='Replay a prompt corpus and report latency')
+    parser.add_argument('--prompts', type=Path, help='Prompt corpus, one prompt per line (default: synthesized)')
+    parser.add_argument('--count', type=int, default=DEFAULT_PROMPTS,
+                        help=f'Synthesized prompts when --prompts is not given (default: {DEFAULT_PROMPTS})')
+    parser.add_argument('--top', type=int, default=10, help='Ambiguous skill groups to show (default: 10)')
+    parser.add_argument('--workers', type=int, default=analyze_skills.DEFAULT_WORKERS,
+                        help='Threads used to parse frontmatter')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore and do not update {analyze_skills.FRONTMATTER_CACHE}')
+    args = parser.parse_args()
+    if not args.prompt and not args.bench:
+        parser.error("one of --prompt or --bench is required")
+    return args
+
+def main():
+    args = parse_args()
+
+    start = time.perf_counter()
+    router = SkillRouter(load_skills(args.workers, use_cache=not args.no_cache))
+    print(f"Compiled router in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    if args.prompt:
+        routed = router.route(args.prompt)
+        if not routed:
+            print("No skills activated")
+        for i, score in routed:
+            skill = router.skills[i]
+            phrases = sorted(p for p in router.automaton.match(args.prompt) if p in skill['activation'])
+            print(f"{skill['file']:<70} {score} match(es): {', '.join(phrases)}")
+
+    if args.bench:
+        if args.prompts:
+            with open(args.prompts, 'r', encoding='utf-8') as f:
+                prompts = [line.strip() for line in f if line.strip()]
+        else:
+            prompts = synthesize_prompts(router.skills, args.count)
+        run_benchmark(router, prompts, args.top)
+
+if __name__ == '__main__':
+    main()
@@ -7,13 +7,64 @@ Parse application/system logs for error patterns and anomalies
 Usage: python3 log-analyzer.py /var/log/application.log
        python3 log-analyzer.py /var/log/application.log --errors-only
        python3 log-analyzer.py /var/log/application.log --since "2025-10-26 14:00"
+       python3 log-analyzer.py /var/log/application.log --export events.parquet
+
+--export writes every event that passes the filters (timestamp, level,
+template_id, template, message, trace_fingerprint) as Parquet when pyarrow
+is installed, otherwise as a directory of NumPy .npz row groups. Load only
+the columns you need:
+
+    pyarrow.parquet.read_table('events.parquet', columns=['timestamp', 'template_id'])
+    numpy.load('events/part-00000.npz')['template_id']    # one row group, one column
 """
 
 import re
+import os
 import sys
+import json
+import glob
+import hashlib
 import argparse
+import functools
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
+
+try:
+    import pyarrow as pa  # Optional: pip install pyarrow (Parquet export)
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import numpy as np  # Optional: columnar export fallback without pyarrow
+except ImportError:
+    np = None
+
+TOP_FRAMES = 5            # Innermost frames of the root cause used for the fingerprint
+EXPORT_ROW_GROUP = 100000  # Events buffered per row group / .npz part
+
+# Variable parts of a message, replaced by <*> to get its template
+TEMPLATE_VARIABLES = re.compile(
+    r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'  # UUIDs
+    r'|\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{16,}\b'                                   # Hex ids, hashes
+    r'|"[^"]*"|\'[^\']*\''                                                          # Quoted values
+    r'|\d+(?:\.\d+)*'                                                                # Numbers, IPs, versions
+)
+EPOCH = datetime(1970, 1, 1)
+
+# A new log record starts with one of the timestamps parse_log_line understands
+RECORD_START = re.compile(r'\{"timestamp"|\[?\d{4}-\d{2}-\d{2}[ T]\d{2}:|[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2} ')
+TRACE_START = re.compile(r'Traceback \(most recent call last\)')
+CONTINUATION = re.compile(
+    r'\s+\S|at |Caused by:|Suppressed:|\.\.\. \d+ (more|common frames omitted)'
+    r'|During handling of the above exception|The above exception was the direct cause'
+)
+EXCEPTION_LINE = re.compile(
+    r'(?:Caused by: )?(?P<type>[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*'
+    r'(?:Error|Exception|Throwable|Exit|Interrupt|Fault|Warning))(?::|$)'
+)
+JAVA_FRAME = re.compile(r'\s*at ([\w$.<>/]+)\(')
+PYTHON_FRAME = re.compile(r'\s*File "([^"]+)", line \d+, in (\S+)')
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Analyze log files for errors and patterns')
@@ -24,6 +75,9 @@ def parse_args():
     parser.add_argument('--until', help='Show logs until timestamp (YYYY-MM-DD HH:MM)')
     parser.add_argument('--pattern', help='Search for specific pattern (regex)')
     parser.add_argument('--top', type=int, default=10, help='Show top N errors (default: 10)')
+    parser.add_argument('--export', help='Write parsed events to a columnar file (Parquet, or .npz parts)')
+    parser.add_argument('--export-format', choices=['auto', 'parquet', 'npz'], default='auto',
+                        help='Export format (default: parquet if pyarrow is installed, else npz)')
     return parser.parse_args()
 
 def parse_log_line(line):
@@ -51,6 +105,7 @@ def parse_log_line(line):
     # If no pattern matched, return raw line
     return {'timestamp': None, 'level': 'INFO', 'message': line.strip()}
 
+@functools.lru_cache(maxsize=4096)  # Consecutive lines mostly share a timestamp; strptime is the slow part
 def parse_timestamp(ts_str):
     """Parse various timestamp formats"""
     if not ts_str:
@@ -70,6 +125,236 @@ def parse_timestamp(ts_str):
 
     return None
 
+class StackTrace:
+    """
+    Continuation lines of one log event (Java or Python stack trace),
+    folded into a root-cause fingerprint as they stream past. Lines are
+    not kept: memory is bounded by TOP_FRAMES, however long the trace.
+    """
+
+    def __init__(self, first_line=None):
+        self.python = False          # Python roots are the first exception, Java roots the last "Caused by"
+        self.expect_exception = False
+        self.frames = deque(maxlen=TOP_FRAMES)
+        self.root_type = None
+        self.root_line = None
+        self.root_frames = ()
+        self.line_count = 0
+        if first_line is not None:
+            self.add(first_line)
+            self.line_count = 0  # The first line is the event itself, not a continuation
+
+    def add(self, line):
+        self.line_count += 1
+        line = line.rstrip('\n')
+
+        if TRACE_START.match(line):
+            self.python = True
+            self.expect_exception = True
+            self.frames.clear()
+            return
+
+        if self.python:
+            frame = PYTHON_FRAME.match(line)
+            if frame:
+                self.frames.append(f"{os.path.basename(frame.group(1))}:{frame.group(2)}")
+            elif self.expect_exception and not line[:1].isspace():
+                # First unindented line after the frames: "ValueError: message"
+                self.expect_exception = False
+                if self.root_type is None:
+                    match = EXCEPTION_LINE.match(line)
+                    self.root_type = match.group('type') if match else line.split(':', 1)[0]
+                    self.root_line = line
+                    self.root_frames = tuple(reversed(self.frames))  # Innermost first
+            return
+
+        frame = JAVA_FRAME.match(line)
+        if frame:
+            if len(self.frames) < TOP_FRAMES:  # Java lists the innermost frame first
+                self.frames.append(re.sub(r'\$\d+', '$', frame.group(1)))
+            return
+        match = EXCEPTION_LINE.match(line)
+        if match:
+            self.close_java_section()
+            self.root_type = match.group('type')
+            self.root_line = line.removeprefix('Caused by: ')
+
+    def close_java_section(self):
+        if self.root_type is not None and not self.python:
+            self.root_frames = tuple(self.frames)
+        self.frames.clear()
+
+    def finish(self):
+        if not self.python:
+            self.close_java_section()
+
+    @property
+    def fingerprint(self):
+        """Stable id for the root cause: exception type + top frames (no messages, no line numbers)"""
+        key = '|'.join((self.root_type or '?',) + self.root_frames)
+        return hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+
+def read_events(lines):
+    """
+    Yield (first line, StackTrace or None) per log event. A line that does
+    not start a new record continues the current event when it looks like
+    part of a trace: indented, "at ...", "Caused by:", "Traceback",
+    an exception line, or the line ending an open Python traceback.
+    Blank lines inside a trace (around "During handling of the above
+    exception...") are held until the next line shows whether the trace
+    goes on. Continuation lines are never run through parse_log_line.
+    """
+    head = trace = None
+    blank = 0  # Blank lines held while a trace is open (counted, not stored)
+    for line in lines:
+        if trace is not None and not line.strip():
+            blank += 1
+            continue
+
+        if head is not None and not RECORD_START.match(line):
+            if (trace is not None and trace.expect_exception) or CONTINUATION.match(line) \
+                    or TRACE_START.match(line) or EXCEPTION_LINE.match(line):
+                if trace is None:
+                    trace = StackTrace()
+                trace.line_count += blank
+                blank = 0
+                trace.add(line)
+                continue
+
+        if head is not None:
+            if trace is not None:
+                trace.finish()
+            yield head, trace
+        for _ in range(blank):  # The trace ended before them: they are events of their own
+            yield '\n', None
+        blank = 0
+        head = line
+        trace = StackTrace(line) if TRACE_START.match(line) else None
+
+    if head is not None:
+        if trace is not None:
+            trace.finish()
+        yield head, trace
+    for _ in range(blank):
+        yield '\n', None
+
+def message_template(message):
+    """Message with ids, numbers and quoted values replaced by <*>, and its stable 64-bit id"""
+    template = TEMPLATE_VARIABLES.sub('<*>', message)
+    return template, template_id(template)
+
+@functools.lru_cache(maxsize=65536)
+def template_id(template):
+    return int.from_bytes(hashlib.blake2b(template.encode(), digest_size=8).digest(), 'big', signed=True)
+
+class ColumnarExporter:
+    """
+    Buffers events column by column and writes a row group every
+    EXPORT_ROW_GROUP events, so memory stays bounded however big the log.
+
+    parquet: one file, one Parquet row group per flush.
+    npz:     a directory of part-NNNNN.npz files (one per row group) plus
+             schema.json with the level codes and template texts. Strings
+             are stored Arrow-style as uint8 data + int64 offsets.
+    """
+
+    COLUMNS = ('timestamp', 'level', 'template_id', 'template', 'message', 'trace_fingerprint')
+
+    def __init__(self, path, fmt='auto'):
+        if fmt == 'auto':
+            fmt = 'parquet' if pq is not None else 'npz'
+        if fmt == 'parquet' and pq is None:
+            raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+        if fmt == 'npz' and np is None:
+            raise RuntimeError("Export requires pyarrow or numpy: pip install pyarrow")
+
+        self.format = fmt
+        self.path = path
+        self.rows = 0
+        self.parts = 0
+        self.columns = {name: [] for name in self.COLUMNS}
+
+        if fmt == 'parquet':
+            self.schema = pa.schema([
+                ('timestamp', pa.timestamp('ms')),
+                ('level', pa.string()),
+                ('template_id', pa.int64()),
+                ('template', pa.string()),
+                ('message', pa.string()),
+                ('trace_fingerprint', pa.string()),
+            ])
+            # Dictionary encoding (on by default) keeps level/template/fingerprint columns tiny
+            self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            if path.endswith('.parquet'):
+                self.path = path[:-len('.parquet')]
+            os.makedirs(self.path, exist_ok=True)
+            # Overwrite like the Parquet writer: parts left from a larger earlier export would be read too
+            for stale in glob.glob(os.path.join(self.path, 'part-*.npz')):
+                os.remove(stale)
+            self.levels = {}
+            self.templates = {}
+
+    def add(self, timestamp, level, message, trace=None):
+        template, tid = message_template(message)
+        columns = self.columns
+        columns['timestamp'].append((timestamp - EPOCH) // timedelta(milliseconds=1) if timestamp else None)
+        columns['level'].append(level)
+        columns['template_id'].append(tid)
+        columns['template'].append(template)
+        columns['message'].append(message)
+        columns['trace_fingerprint'].append(trace.fingerprint if trace and trace.root_type else None)
+        if len(columns['message']) >= EXPORT_ROW_GROUP:
+            self.flush()
+
+    def flush(self):
+        count = len(self.columns['message'])
+        if not count:
+            return
+        if self.format == 'parquet':
+            self.writer.write_table(pa.table(self.columns, schema=self.schema))
+        else:
+            self.write_npz_part()
+        self.rows += count
+        self.parts += 1
+        self.columns = {name: [] for name in self.COLUMNS}
+
+    def write_npz_part(self):
+        nat = np.iinfo(np.int64).min  # datetime64's NaT
+        columns = self.columns
+        for tid, template in zip(columns['template_id'], columns['template']):
+            self.templates.setdefault(tid, template)
+        level_codes = [self.levels.setdefault(level, len(self.levels)) for level in columns['level']]
+        messages = [m.encode('utf-8') for m in columns['message']]
+        offsets = np.zeros(len(messages) + 1, dtype=np.int64)
+        np.cumsum([len(m) for m in messages], out=offsets[1:])
+
+        np.savez_compressed(
+            os.path.join(self.path, f"part-{self.parts:05d}.npz"),
+            timestamp=np.array([nat if t is None else t for t in columns['timestamp']],
+                               dtype=np.int64).view('datetime64[ms]'),
+            level=np.array(level_codes, dtype=np.int32),  # Syslog "levels" are free text: can be many
+            template_id=np.array(columns['template_id'], dtype=np.int64),
+            message_data=np.frombuffer(b''.join(messages), dtype=np.uint8),
+            message_offsets=offsets,
+            trace_fingerprint=np.array([f or '' for f in columns['trace_fingerprint']], dtype='S12'),
+        )
+
+    def close(self):
+        self.flush()
+        if self.format == 'parquet':
+            self.writer.close()
+            return
+        with open(os.path.join(self.path, 'schema.json'), 'w') as f:
+            json.dump({
+                'rows': self.rows,
+                'parts': self.parts,
+                'columns': ['timestamp', 'level', 'template_id', 'message_data', 'message_offsets',
+                            'trace_fingerprint'],
+                'levels': sorted(self.levels, key=self.levels.get),  # level code -> name
+                'templates': {str(tid): template for tid, template in self.templates.items()},
+            }, f, indent=2)
+
 def main():
     args = parse_args()
 
@@ -84,21 +369,34 @@ def main():
     error_messages = Counter()
     errors_by_hour = defaultdict(int)
     error_timeline = []
+    trace_count = 0
+    trace_groups = Counter()
+    trace_samples = {}
 
     print(f"Analyzing log file: {args.logfile}")
     print("=" * 80)
     print()
 
+    try:
+        exporter = ColumnarExporter(args.export, args.export_format) if args.export else None
+    except RuntimeError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
     try:
         with open(args.logfile, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                total_lines += 1
+            for line, trace in read_events(f):
+                total_lines += 1 + (trace.line_count if trace else 0)
 
-                # Parse log line
+                # Parse log line (stack trace lines are already folded into the event)
                 parsed = parse_log_line(line)
                 level = parsed.get('level', '').upper()
                 message = parsed.get('message', '')
                 timestamp = parse_timestamp(parsed.get('timestamp'))
+                if trace and parsed.get('timestamp') is None:
+                    # A bare traceback (e.g. stderr) is an error even without a log record around it
+                    level = 'ERROR'
+                    message = trace.root_line or message
 
                 # Filter by time range
                 if since and timestamp and timestamp < since:
@@ -106,14 +404,18 @@ def main():
                 if until and timestamp and timestamp > until:
                     continue
 
-                # Filter by pattern
-                if args.pattern and not re.search(args.pattern, message, re.IGNORECASE):
+                # Filter by pattern (the root exception counts as part of the message)
+                if args.pattern and not re.search(args.pattern, message, re.IGNORECASE) and not (
+                        trace and trace.root_line and re.search(args.pattern, trace.root_line, re.IGNORECASE)):
                     continue
 
                 # Filter by level
                 if args.errors_only and level not in ['ERROR', 'FATAL', 'CRITICAL']:
                     continue
 
+                if exporter:
+                    exporter.add(timestamp, level, message, trace)
+
                 # Count errors and warnings
                 if level in ['ERROR', 'FATAL', 'CRITICAL']:
                     error_count += 1
@@ -122,6 +424,12 @@ def main():
                     error_key = message[:100] if len(message) > 100 else message
                     error_messages[error_key] += 1
 
+                    # Group stack traces by root cause
+                    if trace and trace.root_type:
+                        trace_count += 1
+                        trace_groups[trace.fingerprint] += 1
+                        trace_samples.setdefault(trace.fingerprint, trace)
+
                     # Group by hour
                     if timestamp:
                         hour_key = timestamp.strftime('%Y-%m-%d %H:00')
@@ -131,11 +439,19 @@ def main():
                 elif level in ['WARN', 'WARNING'] and args.warnings:
                     warning_count += 1
 
+        if exporter:
+            exporter.close()
+
         # Print summary
         print(f"📊 SUMMARY")
         print(f"---------")
         print(f"Total lines: {total_lines:,}")
         print(f"Errors: {error_count:,}")
+        if trace_count:
+            print(f"Stack traces: {trace_count:,} ({len(trace_groups):,} distinct root causes)")
+        if exporter:
+            print(f"Exported: {exporter.rows:,} events in {exporter.parts} row groups -> "
+                  f"{exporter.path} ({exporter.format})")
         if args.warnings:
             print(f"Warnings: {warning_count:,}")
         print()
@@ -150,6 +466,20 @@ def main():
                 print(f"{count:<10} {msg_short}")
             print()
 
+        # Stack traces by root cause
+        if trace_groups:
+            print(f"🧵 TOP {args.top} STACK TRACES (by root cause)")
+            print(f"{'Count':<10} {'Fingerprint':<14} {'Root cause':<56}")
+            print("-" * 80)
+            for fingerprint, count in trace_groups.most_common(args.top):
+                sample = trace_samples[fingerprint]
+                root = sample.root_line or sample.root_type
+                root_short = (root[:53] + '...') if len(root) > 56 else root
+                print(f"{count:<10} {fingerprint:<14} {root_short}")
+                for frame in sample.root_frames[:3]:
+                    print(f"{'':<25} at {frame}")
+            print()
+
         # Errors by hour
         if errors_by_hour:
             print(f"📈 ERRORS BY HOUR")
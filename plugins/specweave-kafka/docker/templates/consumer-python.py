@@ -2,122 +2,919 @@
 Kafka Consumer Example (Python)
 
 Install: pip install kafka-python
+         pip install aiokafka  (optional, for consume_async)
+
+Local testing without a cluster:
+         KAFKA_LOCAL_BROKER=1 python consumer-python.py
 """
 
-from kafka import KafkaConsumer
-from kafka.errors import KafkaError
+import os
+
+if os.environ.get('KAFKA_LOCAL_BROKER'):
+    # In-process stand-in with the same client APIs (see local_broker.py)
+    from local_broker import KafkaConsumer, KafkaProducer, TopicPartition, OffsetAndMetadata, KafkaError
+    from local_broker import AIOKafkaConsumer, ConsumerRebalanceListener
+    AIOConsumerRebalanceListener = ConsumerRebalanceListener
+else:
+    from kafka import KafkaConsumer, KafkaProducer, TopicPartition, OffsetAndMetadata, ConsumerRebalanceListener
+    from kafka.errors import KafkaError
+    try:
+        from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener as AIOConsumerRebalanceListener
+    except ImportError:
+        AIOKafkaConsumer = None  # consume_async() requires aiokafka
+        AIOConsumerRebalanceListener = object
+
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import bisect
+import inspect
 import json
+import multiprocessing
+import queue
 import signal
+import sqlite3
 import sys
+import threading
+import time
+import zlib
+
+try:
+    import orjson  # Optional: pip install orjson (much faster decoding)
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads  # Accepts bytes directly, no .decode() needed
 
 # ========================================
 # Configuration
 # ========================================
 
-consumer = KafkaConsumer(
-    'my-topic',  # Can subscribe to multiple topics
-    bootstrap_servers=['localhost:9092'],
-    client_id='my-app',
-    group_id='my-consumer-group',
+def create_consumer(topic='my-topic', group_id='my-consumer-group', enable_auto_commit=True):
+    """Build the consumer (supervisor workers each build their own after fork)"""
+    return KafkaConsumer(
+        topic,  # Can subscribe to multiple topics
+        bootstrap_servers=['localhost:9092'],
+        client_id='my-app',
+        group_id=group_id,
+
+        # Deserialization (values stay raw bytes; LazyMessage decodes on access)
+        key_deserializer=lambda k: k.decode('utf-8') if k else None,
+
+        # Offset management
+        auto_offset_reset='earliest',  # 'earliest', 'latest', 'none'
+        enable_auto_commit=enable_auto_commit,  # Read once, here: modes that commit themselves pass False
+        auto_commit_interval_ms=5000,
+
+        # Performance tuning
+        fetch_min_bytes=1,          # Minimum data to fetch
+        fetch_max_wait_ms=500,      # Max wait time
+        max_poll_records=2000,      # Upper bound; PollTuner picks max_records per poll
+        max_poll_interval_ms=300000,  # 5 minutes
+
+        # Session management
+        session_timeout_ms=30000,
+        heartbeat_interval_ms=3000,
+
+        # Optional: SASL/SSL (for production)
+        # security_protocol='SASL_SSL',
+        # sasl_mechanism='SCRAM-SHA-512',
+        # sasl_plain_username='user',
+        # sasl_plain_password='password'
+    )
+
+consumer = create_consumer()
+
+def use_manual_commits():
+    """
+    Rebuild the shared consumer with enable_auto_commit=False, keeping its
+    topics and group. The client reads the setting only at construction,
+    so it cannot be switched off on an existing consumer.
+    """
+    global consumer
+    if not consumer.config['enable_auto_commit']:
+        return
+    topics, group_id = sorted(consumer.subscription()), consumer.config['group_id']
+    consumer.close()
+    consumer = create_consumer(topics[0], group_id, enable_auto_commit=False)
+    if len(topics) > 1:
+        consumer.subscribe(topics=topics)
+
+# Dead letter queue
+DLQ_TOPIC = 'my-topic-dlq'
+DLQ_MAX_PENDING = 10000         # Unacknowledged DLQ sends before send_to_dlq blocks
+
+# Manual commit mode (consume_manual_commit)
+MANUAL_COMMIT_EVERY = 2000      # Records between offset commits
+MANUAL_COMMIT_INTERVAL = 5      # ...or seconds, whichever comes first
+DEDUP_DB_PATH = 'consumer-dedup.db'  # Shared by supervisor workers (partitions move on rebalance)
+DEDUP_BY = 'offset'             # 'offset' (topic/partition/offset) or 'key' (producer-unique keys)
+DEDUP_TTL_SECONDS = 24 * 3600   # Must outlive the longest redelivery window
+
+# Pipelined batch mode (consume_pipelined)
+PIPELINE_WORKERS = 8            # Handler threads
+PIPELINE_LANE_SIZE = 500        # Queued records per worker lane
+PIPELINE_MAX_IN_FLIGHT = 2000   # Pause fetching above this many unfinished records
+
+# Hot path
+EVENT_TYPE_HEADER = 'event-type'  # Producers set this so skipped events are never decoded
+KEY_EVENT_SEPARATOR = None      # e.g. ':' to route keys like 'order_created:123'
+LOG_LINES_PER_SECOND = 20       # Structured log budget, excess lines are counted and dropped
+
+# Adaptive polling (consume_batch, consume_pipelined)
+POLL_MIN_RECORDS = 10
+POLL_MAX_RECORDS = 2000         # Keep <= max_poll_records above
+POLL_MIN_TIMEOUT_MS = 10
+POLL_MAX_TIMEOUT_MS = 1000
+POLL_INTERVAL_MS = 300000       # Keep == max_poll_interval_ms above
+POLL_BUDGET_FRACTION = 0.5      # Largest share of max_poll_interval_ms one batch may take
+POLL_BACKLOG_RECORDS = 10000    # Lag above this means "behind": never wait in poll()
+
+# Metrics
+# Prometheus scrape endpoint (/metrics), 0 to disable; supervisor workers use the ports above it
+METRICS_PORT = int(os.environ.get('CONSUMER_METRICS_PORT', 9464))
+METRICS_JSON_PATH = None        # e.g. 'consumer-metrics.json' for periodic JSON dumps
+METRICS_JSON_INTERVAL = 10      # Seconds between JSON dumps
+LAG_REFRESH_INTERVAL = 5        # Seconds between end-offset lookups for lag
+
+# Supervisor mode (consume_supervised)
+SUPERVISOR_PROCESSES = os.cpu_count() or 1
+SUPERVISOR_STATS_INTERVAL = 10  # Seconds between aggregated stats lines
+SUPERVISOR_MAX_BACKOFF = 30     # Restart delay cap (seconds) for crash-looping workers
+
+# asyncio mode (consume_async)
+ASYNC_CONCURRENCY = 500         # Handler coroutines (one lane each)
+ASYNC_MAX_IN_FLIGHT = 5000      # Fetched but unfinished records
+
+# Value format (see serializers.py)
+VALUE_FORMAT = 'json'           # Anything else decodes by content-type header (json, msgpack, avro)
+SCHEMA_REGISTRY_PATH = 'schema-registry.db'
+
+if VALUE_FORMAT == 'json':
+    value_codec = None  # Plain JSON, no header lookups
+else:
+    from serializers import LocalSchemaRegistry, ValueCodec
+    value_codec = ValueCodec(registry=LocalSchemaRegistry(SCHEMA_REGISTRY_PATH))
+
+# ========================================
+# Metrics
+# ========================================
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BATCH_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2000, 5000)
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (Prometheus cumulative semantics)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-th observation; the overflow
+        bucket reports the largest finite bound (json.dumps writes inf as
+        the non-standard Infinity).
+        """
+        with self._lock:
+            target, seen = q * self.count, 0
+            for bound, count in zip(self.buckets + (self.buckets[-1],), self.counts):
+                seen += count
+                if count and seen >= target:
+                    return bound
+            return 0.0
+
+    def prometheus(self, name, labels=''):
+        lines, cumulative = [], 0
+        prefix, suffix = (f'{labels},', f'{{{labels}}}') if labels else ('', '')
+        with self._lock:
+            for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{suffix} {self.total}')
+            lines.append(f'{name}_count{suffix} {self.count}')
+        return lines
+
+class ConsumerMetrics:
+    """
+    Records/sec, poll vs processing time, handler and commit latency
+    histograms, and per-partition lag (end offset - current position).
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.records = {}                   # topic -> count
+        self.errors = 0
+        self.poll_seconds = 0.0             # Time blocked in poll()
+        self.processing_seconds = 0.0       # Time between polls (handling the batch)
+        self.handler_latency = Histogram(LATENCY_BUCKETS)
+        self.commit_latency = Histogram(LATENCY_BUCKETS)
+        self.poll_records = Histogram(BATCH_BUCKETS)
+        self.lag = {}                       # TopicPartition -> records behind
+        self._last_poll_return = None
+        self._last_lag_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def record_handled(self, topic, seconds):
+        self.handler_latency.observe(seconds)
+        with self._lock:
+            self.records[topic] = self.records.get(topic, 0) + 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record_poll(self, started, returned, record_count):
+        with self._lock:
+            if self._last_poll_return is not None:
+                self.processing_seconds += started - self._last_poll_return
+            self.poll_seconds += returned - started
+            self._last_poll_return = returned
+        self.poll_records.observe(record_count)
+
+    def lag_due(self):
+        return time.monotonic() - self._last_lag_refresh >= LAG_REFRESH_INTERVAL
+
+    def set_lag(self, end_offsets, positions):
+        self._last_lag_refresh = time.monotonic()
+        self.lag = {tp: max(0, end - positions[tp]) for tp, end in end_offsets.items() if tp in positions}
+
+    def snapshot(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        total = sum(self.records.values())
+        return {
+            'uptime_seconds': round(elapsed, 1),
+            'records_total': total,
+            'records_per_second': round(total / elapsed, 1),
+            'errors_total': self.errors,
+            'poll_seconds_total': round(self.poll_seconds, 3),
+            'processing_seconds_total': round(self.processing_seconds, 3),
+            'handler_latency_p50_seconds': self.handler_latency.quantile(0.5),
+            'handler_latency_p99_seconds': self.handler_latency.quantile(0.99),
+            'commit_latency_p99_seconds': self.commit_latency.quantile(0.99),
+            'poll_records_p50': self.poll_records.quantile(0.5),
+            'lag': {f"{tp.topic}-{tp.partition}": lag for tp, lag in sorted(self.lag.items())},
+            'lag_total': sum(self.lag.values()),
+        }
 
-    # Deserialization
-    key_deserializer=lambda k: k.decode('utf-8') if k else None,
-    value_deserializer=lambda v: json.loads(v.decode('utf-8')),
+    def prometheus(self):
+        lines = [
+            '# TYPE kafka_consumer_records_total counter',
+            *(f'kafka_consumer_records_total{{topic="{t}"}} {c}' for t, c in sorted(self.records.items())),
+            '# TYPE kafka_consumer_errors_total counter',
+            f'kafka_consumer_errors_total {self.errors}',
+            '# TYPE kafka_consumer_poll_seconds_total counter',
+            f'kafka_consumer_poll_seconds_total {self.poll_seconds}',
+            '# TYPE kafka_consumer_processing_seconds_total counter',
+            f'kafka_consumer_processing_seconds_total {self.processing_seconds}',
+            '# TYPE kafka_consumer_handler_latency_seconds histogram',
+            *self.handler_latency.prometheus('kafka_consumer_handler_latency_seconds'),
+            '# TYPE kafka_consumer_commit_latency_seconds histogram',
+            *self.commit_latency.prometheus('kafka_consumer_commit_latency_seconds'),
+            '# TYPE kafka_consumer_poll_records histogram',
+            *self.poll_records.prometheus('kafka_consumer_poll_records'),
+            '# TYPE kafka_consumer_lag gauge',
+            *(f'kafka_consumer_lag{{topic="{tp.topic}",partition="{tp.partition}"}} {lag}'
+              for tp, lag in sorted(self.lag.items())),
+        ]
+        return '\n'.join(lines) + '\n'
 
-    # Offset management
-    auto_offset_reset='earliest',  # 'earliest', 'latest', 'none'
-    enable_auto_commit=True,
-    auto_commit_interval_ms=5000,
+metrics = ConsumerMetrics()
 
-    # Performance tuning
-    fetch_min_bytes=1,          # Minimum data to fetch
-    fetch_max_wait_ms=500,      # Max wait time
-    max_poll_records=500,       # Messages per poll
-    max_poll_interval_ms=300000,  # 5 minutes
+def instrumented(handler):
+    """Wrap a message handler to record per-record latency"""
+    def wrapper(message):
+        start = time.perf_counter()
+        try:
+            return handler(message)
+        finally:
+            metrics.record_handled(message.topic, time.perf_counter() - start)
+    wrapper.__name__ = handler.__name__
+    wrapper.__doc__ = handler.__doc__
+    return wrapper
 
-    # Session management
-    session_timeout_ms=30000,
-    heartbeat_interval_ms=3000,
+def refresh_lag():
+    """Update per-partition lag at most every LAG_REFRESH_INTERVAL (consumer thread only)"""
+    if not metrics.lag_due():
+        return
+    partitions = consumer.assignment()
+    if partitions:
+        metrics.set_lag(consumer.end_offsets(list(partitions)),
+                        {tp: consumer.position(tp) for tp in partitions})
 
-    # Optional: SASL/SSL (for production)
-    # security_protocol='SASL_SSL',
-    # sasl_mechanism='SCRAM-SHA-512',
-    # sasl_plain_username='user',
-    # sasl_plain_password='password'
-)
+def timed_poll(**kwargs):
+    """consumer.poll() that records poll time, processing time, batch size and lag"""
+    started = time.perf_counter()
+    batch = consumer.poll(**kwargs)
+    metrics.record_poll(started, time.perf_counter(), sum(len(m) for m in batch.values()))
+    refresh_lag()
+    return batch
+
+async def refresh_lag_async(async_consumer):
+    """refresh_lag() for aiokafka, where end_offsets (and position) are coroutines"""
+    if not metrics.lag_due():
+        return
+    partitions = list(async_consumer.assignment())
+    if partitions:
+        positions = {}
+        for tp in partitions:
+            position = async_consumer.position(tp)
+            positions[tp] = await position if inspect.isawaitable(position) else position
+        metrics.set_lag(await async_consumer.end_offsets(partitions), positions)
+
+def timed_commit(**kwargs):
+    start = time.perf_counter()
+    consumer.commit(**kwargs)
+    metrics.commit_latency.observe(time.perf_counter() - start)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith('/metrics.json'):
+            body, content_type = json.dumps(metrics.snapshot()).encode(), 'application/json'
+        elif self.path.startswith('/metrics'):
+            body, content_type = metrics.prometheus().encode(), 'text/plain; version=0.0.4'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of stdout
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve /metrics (Prometheus text) and /metrics.json on a daemon thread"""
+    try:
+        server = ThreadingHTTPServer(('0.0.0.0', port), _MetricsHandler)
+    except OSError as e:
+        # Port taken: keep consuming (a supervised worker would otherwise crash-loop)
+        print(f"⚠️  Metrics endpoint disabled, port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    print(f"📈 Metrics at http://localhost:{port}/metrics")
+    return server
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def start_metrics_dump(path=METRICS_JSON_PATH, interval=METRICS_JSON_INTERVAL):
+    """Write a JSON metrics snapshot to path every `interval` seconds"""
+    def run():
+        while True:
+            time.sleep(interval)
+            write_json_atomic(path, metrics.snapshot())
+    threading.Thread(target=run, name='metrics-dump', daemon=True).start()
+
+def start_metrics():
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+    if METRICS_JSON_PATH:
+        start_metrics_dump(METRICS_JSON_PATH, METRICS_JSON_INTERVAL)
 
 # ========================================
 # Consumer Functions
 # ========================================
 
+class RateLimitedLog:
+    """
+    Structured (JSON lines) log capped at `rate` lines per second.
+    Dropped lines are counted and reported once the next second starts.
+    """
+
+    def __init__(self, rate=LOG_LINES_PER_SECOND):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._second = 0
+        self._emitted = 0
+        self._dropped = 0
+
+    def __call__(self, event, **fields):
+        now = time.time()
+        with self._lock:
+            if int(now) != self._second:
+                dropped = self._dropped
+                self._second, self._emitted, self._dropped = int(now), 0, 0
+                if dropped:
+                    self._emit(now, 'log_lines_dropped', {'count': dropped})
+            if self._emitted >= self.rate:
+                self._dropped += 1
+                return
+            self._emitted += 1
+        self._emit(now, event, fields)
+
+    @staticmethod
+    def _emit(now, event, fields):
+        print(json.dumps({'ts': round(now, 3), 'event': event, **fields}, default=str))
+
+log = RateLimitedLog()
+
+def decode_value(raw, headers):
+    """JSON, or with VALUE_FORMAT set, whatever format the content-type header names"""
+    return value_codec.decode(raw, headers) if value_codec else json_loads(raw)
+
+class LazyMessage:
+    """
+    Consumer record view that JSON-decodes the payload on first access.
+    Everything else (topic, partition, offset, key, headers...) passes through.
+    """
+
+    __slots__ = ('_record', '_value', '_decoded')
+
+    def __init__(self, record):
+        self._record = record
+        self._value = None
+        self._decoded = False
+
+    def __getattr__(self, name):
+        return getattr(self._record, name)
+
+    @property
+    def raw_value(self):
+        return self._record.value
+
+    @property
+    def value(self):
+        if not self._decoded:
+            raw = self._record.value
+            self._value = decode_value(raw, self._record.headers) if raw is not None else None
+            self._decoded = True
+        return self._value
+
+    def header(self, name):
+        for key, value in self._record.headers or ():
+            if key == name:
+                return value.decode('utf-8') if isinstance(value, bytes) else value
+        return None
+
+def resolve_event_type(message):
+    """Event type from header, then key, then (last resort) the decoded payload"""
+    event_type = message.header(EVENT_TYPE_HEADER)
+    if event_type is None and KEY_EVENT_SEPARATOR and message.key and KEY_EVENT_SEPARATOR in message.key:
+        event_type = message.key.split(KEY_EVENT_SEPARATOR, 1)[0]
+    if event_type is None:
+        value = message.value
+        event_type = value.get('event') if isinstance(value, dict) else None
+    return event_type
+
+@instrumented
 def process_message(message):
     """Process a single message"""
+    message = message if isinstance(message, LazyMessage) else LazyMessage(message)
     try:
-        print(f"""
-📨 Message received:
-  Topic: {message.topic}
-  Partition: {message.partition}
-  Offset: {message.offset}
-  Key: {message.key}
-  Value: {message.value}
-  Timestamp: {message.timestamp}
-  Headers: {dict(message.headers) if message.headers else {}}
-        """)
-
         # Your business logic here
-        event_type = message.value.get('event')
+        event_type = resolve_event_type(message)
+        handler = EVENT_HANDLERS.get(event_type)
 
-        if event_type == 'user_login':
-            handle_user_login(message.value)
-        elif event_type == 'order_created':
-            handle_order_created(message.value)
-        else:
-            print(f"Unknown event type: {event_type}")
+        if handler is None:
+            log('event_skipped', event_type=event_type, topic=message.topic,
+                partition=message.partition, offset=message.offset)
+            return
+
+        handler(message.value)
 
     except Exception as e:
-        print(f"❌ Error processing message: {e}")
+        metrics.record_error()
+        log('processing_failed', error=str(e), topic=message.topic,
+            partition=message.partition, offset=message.offset)
         # Send to dead letter queue
         send_to_dlq(message, e)
 
 def handle_user_login(data):
     """Handle user login event"""
-    print(f"👤 User login: {data.get('userId')}")
+    log('user_login', user_id=data.get('userId'))
     # Update user last login time
     # Send welcome email
     # etc.
 
 def handle_order_created(data):
     """Handle order created event"""
-    print(f"🛒 Order created: {data}")
+    log('order_created', order_id=data.get('orderId'))
     # Process order
     # Send confirmation email
     # Update inventory
 
-def send_to_dlq(message, error):
-    """Send failed message to dead letter queue"""
-    from kafka import KafkaProducer
-    import json
+EVENT_HANDLERS = {
+    'user_login': handle_user_login,
+    'order_created': handle_order_created,
+}
 
-    producer = KafkaProducer(
-        bootstrap_servers=['localhost:9092'],
-        value_serializer=lambda v: json.dumps(v).encode('utf-8')
-    )
+async def process_message_async(message):
+    """Process a single message with handlers that await I/O"""
+    message = message if isinstance(message, LazyMessage) else LazyMessage(message)
+    try:
+        event_type = resolve_event_type(message)
+        handler = ASYNC_EVENT_HANDLERS.get(event_type)
+
+        if handler is None:
+            log('event_skipped', event_type=event_type, topic=message.topic,
+                partition=message.partition, offset=message.offset)
+            return
+
+        await handler(message.value)
+
+    except Exception as e:
+        metrics.record_error()
+        log('processing_failed', error=str(e), topic=message.topic,
+            partition=message.partition, offset=message.offset)
+        # send_to_dlq may block on backpressure, keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, send_to_dlq, message, e)
+
+async def handle_user_login_async(data):
+    """Handle user login event"""
+    log('user_login', user_id=data.get('userId'))
+    # await http_session.post(...)
+    # await db.execute(...)
+
+async def handle_order_created_async(data):
+    """Handle order created event"""
+    log('order_created', order_id=data.get('orderId'))
+    # await inventory_client.reserve(...)
+
+ASYNC_EVENT_HANDLERS = {
+    'user_login': handle_user_login_async,
+    'order_created': handle_order_created_async,
+}
 
+# One long-lived DLQ producer, created on first failure and shared by all
+# worker threads (KafkaProducer is thread-safe)
+_dlq_producer = None
+_dlq_lock = threading.RLock()  # Re-entrant: signal_handler closes the producer on the main thread
+_dlq_slots = threading.BoundedSemaphore(DLQ_MAX_PENDING)
+
+def get_dlq_producer():
+    """Create the shared DLQ producer on first use"""
+    global _dlq_producer
+    if _dlq_producer is None:
+        with _dlq_lock:
+            if _dlq_producer is None:
+                _dlq_producer = KafkaProducer(
+                    bootstrap_servers=['localhost:9092'],
+                    client_id='my-app-dlq',
+                    value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+
+                    # Batch failures instead of one request per message
+                    linger_ms=50,
+                    batch_size=65536,
+                    compression_type='lz4',
+
+                    # Failed messages must not be lost
+                    acks='all',
+                    retries=5
+                )
+    return _dlq_producer
+
+def _release_dlq_slot(result):
+    _dlq_slots.release()
+    if isinstance(result, Exception):
+        log('dlq_write_failed', error=str(result))
+
+def dlq_value(message):
+    """(value, undecodable): the decoded payload when possible, otherwise the raw text (e.g. invalid JSON)"""
+    raw = message.raw_value if isinstance(message, LazyMessage) else message.value
+    if not isinstance(raw, (bytes, bytearray)):
+        return raw, False
+    try:
+        return decode_value(raw, message.headers), False
+    except (ValueError, KeyError, IndexError):
+        return raw.decode('utf-8', errors='replace'), True
+
+def send_to_dlq(message, error):
+    """Send failed message to dead letter queue"""
+    value, undecodable = dlq_value(message)
     dlq_message = {
         'original_topic': message.topic,
         'original_partition': message.partition,
         'original_offset': message.offset,
         'original_key': message.key,
-        'original_value': message.value,
+        'original_value': value,
+        'original_value_undecodable': undecodable,  # Raw text: replay re-sends it without re-encoding
+        # Restored on replay, so header-based dispatch (event-type) still applies
+        'original_headers': [[key, header_value.decode('utf-8', errors='replace') if header_value is not None else None]
+                             for key, header_value in message.headers or ()],
+        'error_type': type(error).__name__,
         'error_message': str(error),
         'failed_at': int(time.time() * 1000)
     }
 
-    producer.send('my-topic-dlq', value=dlq_message)
-    producer.flush()
-    producer.close()
+    # Backpressure: block while too many DLQ sends are unacknowledged
+    _dlq_slots.acquire()
+    try:
+        # error-type header lets replay-dlq.py filter without decoding values
+        future = get_dlq_producer().send(DLQ_TOPIC, value=dlq_message,
+                                         headers=[('error-type', dlq_message['error_type'].encode())])
+    except Exception:
+        _dlq_slots.release()
+        raise
+
+    future.add_both(_release_dlq_slot)
+    log('sent_to_dlq', topic=message.topic, partition=message.partition, offset=message.offset)
+
+def close_dlq_producer(timeout=30):
+    """Flush pending DLQ messages and close the shared producer"""
+    global _dlq_producer
+    with _dlq_lock:
+        if _dlq_producer is not None:
+            _dlq_producer.flush(timeout=timeout)
+            _dlq_producer.close(timeout=timeout)
+            _dlq_producer = None
+
+# ========================================
+# Adaptive Polling
+# ========================================
+
+class PollTuner:
+    """
+    Picks poll(max_records, timeout_ms) from what the last polls looked like:
+
+    - Full batches: grow max_records (x1.25) and stop waiting in poll()
+    - Part-filled batches with no backlog (trickle): wait longer per poll
+    - Lag above POLL_BACKLOG_RECORDS: never wait, data is already there
+    - Batch took longer than the budget (POLL_BUDGET_FRACTION of
+      max_poll_interval_ms): halve max_records, and cap it by the
+      per-record cost so the next batch fits, before the group
+      coordinator evicts this consumer and triggers a rebalance
+    """
+
+    def __init__(self, min_records=POLL_MIN_RECORDS, max_records=POLL_MAX_RECORDS,
+                 min_timeout_ms=POLL_MIN_TIMEOUT_MS, max_timeout_ms=POLL_MAX_TIMEOUT_MS,
+                 poll_interval_ms=POLL_INTERVAL_MS, budget_fraction=POLL_BUDGET_FRACTION,
+                 backlog_records=POLL_BACKLOG_RECORDS):
+        self.min_records = min_records
+        self.max_records_limit = max_records
+        self.min_timeout_ms = min_timeout_ms
+        self.max_timeout_ms = max_timeout_ms
+        self.budget_seconds = poll_interval_ms / 1000 * budget_fraction
+        self.backlog_records = backlog_records
+        self.max_records = max(min_records, min(100, max_records))
+        self.timeout_ms = max(min_timeout_ms, min(100, max_timeout_ms))
+        self.seconds_per_record = None   # EWMA of handler cost
+
+    def poll_kwargs(self):
+        return {'timeout_ms': self.timeout_ms, 'max_records': self.max_records}
+
+    def observe(self, record_count, processing_seconds, lag=0):
+        """Feed back one poll: records returned and time spent handling them"""
+        if record_count:
+            sample = processing_seconds / record_count
+            self.seconds_per_record = sample if self.seconds_per_record is None \
+                else 0.8 * self.seconds_per_record + 0.2 * sample
+
+        fill = record_count / self.max_records
+        if processing_seconds > self.budget_seconds:
+            self.max_records = self.max_records // 2
+        elif fill >= 0.9:
+            self.max_records = int(self.max_records * 1.25) + 1
+        if self.seconds_per_record:
+            self.max_records = min(self.max_records, int(self.budget_seconds / self.seconds_per_record))
+        self.max_records = max(self.min_records, min(self.max_records, self.max_records_limit))
+
+        if fill >= 0.9 or lag >= self.backlog_records:
+            self.timeout_ms = self.min_timeout_ms
+        elif fill < 0.5:
+            self.timeout_ms = min(self.max_timeout_ms, self.timeout_ms * 2)
+
+# ========================================
+# Idempotent Processing
+# ========================================
+
+class DedupStore:
+    """
+    Records handled messages in SQLite so redelivered ones are skipped.
+
+    A message is marked right after its handler returns (or after it was
+    sent to the DLQ), so a crash between handling and the next offset
+    commit replays at most the one in-flight record instead of the whole
+    uncommitted batch. Marks older than `ttl` are purged on each commit.
+    """
 
-    print("📮 Message sent to DLQ")
+    def __init__(self, path=None, by=DEDUP_BY, ttl=DEDUP_TTL_SECONDS):
+        if by not in ('offset', 'key'):
+            raise ValueError(f"DEDUP_BY must be 'offset' or 'key', got {by!r}")
+        self.by = by
+        self.ttl = ttl
+        self.duplicates = 0
+        self.conn = sqlite3.connect(path or DEDUP_DB_PATH, timeout=30, isolation_level=None)  # Autocommit
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')  # Survives process crashes, not power loss
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS processed (id TEXT PRIMARY KEY, processed_at REAL NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS processed_at_idx ON processed (processed_at)')
+
+    def message_id(self, message):
+        if self.by == 'key' and message.key is not None:
+            return f"{message.topic}:key:{message.key}"
+        return f"{message.topic}:{message.partition}:{message.offset}"
+
+    def seen(self, message):
+        row = self.conn.execute(
+            'SELECT 1 FROM processed WHERE id = ?', (self.message_id(message),)).fetchone()
+        if row:
+            self.duplicates += 1
+        return row is not None
+
+    def mark(self, message):
+        self.conn.execute('INSERT OR REPLACE INTO processed (id, processed_at) VALUES (?, ?)',
+                          (self.message_id(message), time.time()))
+
+    def expire(self):
+        self.conn.execute('DELETE FROM processed WHERE processed_at < ?', (time.time() - self.ttl,))
+
+    def close(self):
+        self.conn.close()
+
+# ========================================
+# Pipelined Processing
+# ========================================
+
+def offset_and_metadata(offset):
+    """OffsetAndMetadata across kafka-python versions (2.1+ adds leader_epoch)"""
+    try:
+        return OffsetAndMetadata(offset, None)
+    except TypeError:
+        return OffsetAndMetadata(offset, None, -1)
+
+class OffsetTracker:
+    """
+    Tracks dispatched and completed offsets per partition.
+
+    Records finish out of order when handled concurrently, so the safe
+    commit point is the highest offset below which everything completed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}    # TopicPartition -> deque of dispatched offsets (ascending)
+        self._done = {}       # TopicPartition -> set of completed offsets
+        self._in_flight = 0
+
+    def dispatched(self, tp, offset):
+        with self._lock:
+            self._pending.setdefault(tp, deque()).append(offset)
+            self._done.setdefault(tp, set())
+            self._in_flight += 1
+
+    def completed(self, tp, offset):
+        with self._lock:
+            self._in_flight -= 1
+            done = self._done.get(tp)
+            if done is not None:  # None: partition revoked while the record was in flight
+                done.add(offset)
+
+    def in_flight(self):
+        with self._lock:
+            return self._in_flight
+
+    def revoke(self, partitions):
+        """Forget revoked partitions; their re-dispatched offsets start a fresh deque"""
+        with self._lock:
+            for tp in partitions:
+                self._pending.pop(tp, None)
+                self._done.pop(tp, None)
+
+    def committable(self):
+        """Pop contiguous completed offsets; returns {tp: next offset to consume}"""
+        offsets = {}
+        with self._lock:
+            for tp, pending in self._pending.items():
+                done = self._done[tp]
+                last = None
+                while pending and pending[0] in done:
+                    last = pending.popleft()
+                    done.discard(last)
+                if last is not None:
+                    offsets[tp] = last + 1
+        return offsets
+
+class KeyedWorkerPool:
+    """
+    Fixed worker threads, each draining its own bounded queue (lane).
+
+    Records with the same lane key always land on the same lane, so they
+    are handled in order while other keys run in parallel. A full lane
+    blocks submit(), which is the backpressure of last resort.
+    """
+
+    _STOP = object()
+
+    def __init__(self, workers, lane_size, handler, on_done):
+        self._handler = handler
+        self._on_done = on_done
+        self._lanes = [queue.Queue(maxsize=lane_size) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(lane,), name=f"kafka-worker-{i}", daemon=True)
+            for i, lane in enumerate(self._lanes)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self, lane):
+        while True:
+            message = lane.get()
+            if message is self._STOP:
+                return
+            try:
+                self._handler(message)
+            except Exception as e:
+                # Anything escaping the handler (e.g. send_to_dlq failing) must not kill the
+                # lane: a dead worker leaves submit() and shutdown() blocked on a full queue
+                log('worker_error', topic=message.topic, partition=message.partition,
+                    offset=message.offset, error=repr(e))
+            finally:
+                self._on_done(TopicPartition(message.topic, message.partition), message.offset)
+
+    def submit(self, lane_key, message):
+        self._lanes[lane_index(lane_key, len(self._lanes))].put(message)
+
+    def shutdown(self):
+        """Finish queued records, then stop all workers"""
+        for lane in self._lanes:
+            lane.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+
+class TrackerRebalanceListener(ConsumerRebalanceListener):
+    """
+    On revoke: commit what completed for the revoked partitions, then drop
+    their tracker state. Their offsets are re-dispatched after the
+    rebalance (here or on another member), and records still in flight
+    for them complete without being committed.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def on_partitions_revoked(self, revoked):
+        revoked = set(revoked)
+        offsets = {tp: o for tp, o in self.tracker.committable().items() if tp in revoked}
+        if offsets:
+            try:
+                timed_commit(offsets={tp: offset_and_metadata(o) for tp, o in offsets.items()})
+            except KafkaError as e:
+                print(f"⚠️  Commit on revoke failed: {e}")
+        self.tracker.revoke(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        pass
+
+class AsyncTrackerRebalanceListener(AIOConsumerRebalanceListener):
+    """TrackerRebalanceListener for aiokafka, which awaits coroutine callbacks"""
+
+    def __init__(self, async_consumer, tracker):
+        self.consumer = async_consumer
+        self.tracker = tracker
+
+    async def on_partitions_revoked(self, revoked):
+        revoked = set(revoked)
+        offsets = {tp: o for tp, o in self.tracker.committable().items() if tp in revoked}
+        if offsets:
+            try:
+                await self.consumer.commit(offsets)
+            except Exception as e:  # aiokafka errors do not derive from kafka-python's KafkaError
+                print(f"⚠️  Commit on revoke failed: {e}")
+        self.tracker.revoke(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        pass
+
+def lane_index(lane_key, lanes):
+    # crc32 is stable across processes, unlike hash() on str
+    return zlib.crc32(repr(lane_key).encode()) % lanes
+
+def lane_key(message, ordering):
+    """Per-key ordering within a partition, or strict per-partition ordering"""
+    if ordering == 'key' and message.key is not None:
+        return (message.topic, message.partition, message.key)
+    return (message.topic, message.partition)
+
+def commit_completed(tracker):
+    """Async-commit the highest contiguous completed offset per partition"""
+    offsets = tracker.committable()
+    if offsets:
+        started = time.perf_counter()
+
+        def on_commit_complete(committed, response):
+            metrics.commit_latency.observe(time.perf_counter() - started)
+            if isinstance(response, Exception):
+                print(f"⚠️  Async commit failed: {response}")
+
+        consumer.commit_async(
+            offsets={tp: offset_and_metadata(offset) for tp, offset in offsets.items()},
+            callback=on_commit_complete
+        )
 
 # ========================================
 # Consume Methods
@@ -130,9 +927,11 @@ def consume_simple():
     try:
         for message in consumer:
             process_message(message)
+            refresh_lag()
     except KeyboardInterrupt:
         pass
     finally:
+        close_dlq_producer()
         consumer.close()
         print("👋 Consumer disconnected")
 
@@ -140,13 +939,13 @@ def consume_batch():
     """Consume messages in batches"""
     print("📡 Consumer connected (batch mode)")
 
+    tuner = PollTuner()
+
     try:
         while True:
             # Poll for messages (returns a dict of topic partition to records)
-            message_batch = consumer.poll(timeout_ms=1000, max_records=100)
-
-            if not message_batch:
-                continue
+            message_batch = timed_poll(**tuner.poll_kwargs())
+            started = time.perf_counter()
 
             for topic_partition, messages in message_batch.items():
                 print(f"📦 Processing batch: {len(messages)} messages "
@@ -156,39 +955,328 @@ def consume_batch():
                     process_message(message)
 
                 # Commit offsets after processing batch
-                consumer.commit()
+                timed_commit()
+
+            tuner.observe(sum(len(m) for m in message_batch.values()),
+                          time.perf_counter() - started, sum(metrics.lag.values()))
 
     except KeyboardInterrupt:
         pass
     finally:
+        close_dlq_producer()
         consumer.close()
         print("👋 Consumer disconnected")
 
-def consume_manual_commit():
-    """Consume with manual offset management"""
+def consume_pipelined(workers=PIPELINE_WORKERS, ordering='key'):
+    """
+    Consume with a bounded worker pool, preserving order per key
+    (ordering='key') or per partition (ordering='partition').
+    Only offsets whose predecessors all completed are committed.
+    """
+    print(f"📡 Consumer connected (pipelined, {workers} workers, {ordering} ordering)")
+
+    # Offsets are committed by the pipeline, not on a timer
+    use_manual_commits()
+
+    tracker = OffsetTracker()
+    consumer.subscribe(topics=list(consumer.subscription()), listener=TrackerRebalanceListener(tracker))
+    pool = KeyedWorkerPool(workers, PIPELINE_LANE_SIZE, process_message, tracker.completed)
+    tuner = PollTuner()
+    paused = False
+
+    try:
+        while True:
+            message_batch = timed_poll(**tuner.poll_kwargs())
+            started = time.perf_counter()
+
+            for topic_partition, messages in message_batch.items():
+                for message in messages:
+                    tracker.dispatched(topic_partition, message.offset)
+                    pool.submit(lane_key(message, ordering), message)
+
+            commit_completed(tracker)
+            # Dispatch time includes blocking on full lanes, so slow workers shrink batches too
+            tuner.observe(sum(len(m) for m in message_batch.values()),
+                          time.perf_counter() - started, sum(metrics.lag.values()))
+
+            # Keep polling (heartbeats, no rebalance) while workers catch up
+            in_flight = tracker.in_flight()
+            if not paused and in_flight >= PIPELINE_MAX_IN_FLIGHT:
+                consumer.pause(*consumer.assignment())
+                paused = True
+            elif paused and in_flight < PIPELINE_MAX_IN_FLIGHT // 2:
+                consumer.resume(*consumer.paused())
+                paused = False
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+        close_dlq_producer()
+        offsets = tracker.committable()
+        if offsets:
+            timed_commit(offsets={tp: offset_and_metadata(o) for tp, o in offsets.items()})
+        consumer.close()
+        print("👋 Consumer disconnected")
+
+def consume_manual_commit(commit_every=MANUAL_COMMIT_EVERY, commit_interval=MANUAL_COMMIT_INTERVAL):
+    """
+    Consume with manual offset management, committing every `commit_every`
+    records or `commit_interval` seconds. Messages already in the dedup
+    store (handled before a crash, but not yet committed) are skipped.
+    """
     print("📡 Consumer connected (manual commit)")
 
     # Disable auto-commit
-    consumer._config['enable_auto_commit'] = False
+    use_manual_commits()
+
+    dedup = DedupStore()
+    pending = 0
+    last_commit = time.monotonic()
 
     try:
         for message in consumer:
             try:
-                process_message(message)
+                if dedup.seen(message):
+                    log('duplicate_skipped', topic=message.topic,
+                        partition=message.partition, offset=message.offset)
+                else:
+                    process_message(message)
+                    dedup.mark(message)
+                pending += 1
 
-                # Manual commit after successful processing
-                consumer.commit()
+                # Batched commit; the dedup store covers the uncommitted tail
+                if pending >= commit_every or time.monotonic() - last_commit >= commit_interval:
+                    timed_commit()
+                    dedup.expire()
+                    pending = 0
+                    last_commit = time.monotonic()
+                refresh_lag()
 
             except Exception as e:
                 print(f"❌ Error processing, skipping commit: {e}")
-                # Don't commit offset, message will be redelivered
+                # Don't mark or commit, message will be redelivered
 
     except KeyboardInterrupt:
         pass
     finally:
+        if pending:
+            timed_commit()
+        if dedup.duplicates:
+            print(f"♻️  Skipped {dedup.duplicates} already-processed messages")
+        dedup.close()
+        close_dlq_producer()
         consumer.close()
         print("👋 Consumer disconnected")
 
+async def consume_async(concurrency=ASYNC_CONCURRENCY, ordering='key', async_consumer=None,
+                        topic='my-topic', group_id='my-consumer-group'):
+    """
+    asyncio consumer: `concurrency` handler coroutines, each owning a lane
+    so order is kept per key/partition, with a semaphore bounding records
+    in flight. Pass async_consumer to use an existing (e.g. local) client.
+    """
+    if async_consumer is None:
+        if AIOKafkaConsumer is None:
+            raise RuntimeError("consume_async requires aiokafka: pip install aiokafka")
+        async_consumer = AIOKafkaConsumer(
+            topic,
+            bootstrap_servers='localhost:9092',
+            client_id='my-app',
+            group_id=group_id,
+            key_deserializer=lambda k: k.decode('utf-8') if k else None,
+            auto_offset_reset='earliest',
+            enable_auto_commit=False,  # Offsets committed by the tracker below
+            max_poll_records=500
+        )
+
+    await async_consumer.start()
+    print(f"📡 Consumer connected (asyncio, {concurrency} handlers, {ordering} ordering)")
+
+    tracker = OffsetTracker()
+    # Commits only cover partitions still assigned (aiokafka rejects the rest)
+    async_consumer.subscribe(topics=list(async_consumer.subscription()),
+                             listener=AsyncTrackerRebalanceListener(async_consumer, tracker))
+    slots = asyncio.Semaphore(ASYNC_MAX_IN_FLIGHT)
+    lanes = [asyncio.Queue() for _ in range(concurrency)]
+
+    async def run_lane(lane):
+        while True:
+            tp, message = await lane.get()
+            start = time.perf_counter()
+            try:
+                await process_message_async(message)
+            except Exception as e:
+                # Keep the lane alive (e.g. send_to_dlq failing): a dead lane never releases
+                # its slots, which hangs the dispatcher and the lane.join() on shutdown
+                log('worker_error', topic=message.topic, partition=message.partition,
+                    offset=message.offset, error=repr(e))
+            finally:
+                metrics.record_handled(message.topic, time.perf_counter() - start)
+                tracker.completed(tp, message.offset)
+                slots.release()
+                lane.task_done()
+
+    workers = [asyncio.create_task(run_lane(lane)) for lane in lanes]
+
+    try:
+        while True:
+            started = time.perf_counter()
+            message_batch = await async_consumer.getmany(timeout_ms=100, max_records=500)
+            metrics.record_poll(started, time.perf_counter(), sum(len(m) for m in message_batch.values()))
+            await refresh_lag_async(async_consumer)
+
+            for tp, messages in message_batch.items():
+                for message in messages:
+                    await slots.acquire()  # Backpressure once ASYNC_MAX_IN_FLIGHT is reached
+                    tracker.dispatched(tp, message.offset)
+                    lanes[lane_index(lane_key(message, ordering), concurrency)].put_nowait((tp, message))
+
+            offsets = tracker.committable()
+            if offsets:
+                started = time.perf_counter()
+                await async_consumer.commit(offsets)
+                metrics.commit_latency.observe(time.perf_counter() - started)
+
+    except asyncio.CancelledError:
+        pass
+    finally:
+        # Drain in-flight work and commit what completed
+        await asyncio.gather(*(lane.join() for lane in lanes))
+        for worker in workers:
+            worker.cancel()
+        offsets = tracker.committable()
+        if offsets:
+            await async_consumer.commit(offsets)
+        await async_consumer.stop()
+        print("👋 Consumer disconnected")
+
+# ========================================
+# Multi-Process Supervisor
+# ========================================
+
+supervised_workers = {}  # worker id -> Process (populated in the supervisor only)
+
+def run_worker(worker_id, consume, stats_queue):
+    """Worker process: its own consumer and metrics, same group_id as its siblings"""
+    global consumer, metrics
+    supervised_workers.clear()  # Inherited from the supervisor, not ours to stop
+    consumer = create_consumer()
+    metrics = ConsumerMetrics()
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT + 1 + worker_id)
+
+    def report_stats():
+        while True:
+            time.sleep(SUPERVISOR_STATS_INTERVAL / 2)
+            stats_queue.put((worker_id, metrics.snapshot()))
+
+    threading.Thread(target=report_stats, name='stats-reporter', daemon=True).start()
+    consume()
+
+def merge_snapshots(snapshots):
+    """Group-wide view of per-process snapshots (each owns disjoint partitions)"""
+    merged = {
+        key: round(sum(s[key] for s in snapshots), 3)
+        for key in ('records_total', 'records_per_second', 'errors_total',
+                    'poll_seconds_total', 'processing_seconds_total')
+    }
+    merged['handler_latency_p99_seconds'] = max(
+        (s['handler_latency_p99_seconds'] for s in snapshots), default=0.0)
+    merged['lag'] = {}
+    for snapshot in snapshots:
+        merged['lag'].update(snapshot['lag'])
+    merged['lag_total'] = sum(merged['lag'].values())
+    return merged
+
+def stop_supervised_workers(timeout=30):
+    """SIGTERM every worker (each runs signal_handler) and wait for them to exit"""
+    for proc in supervised_workers.values():
+        if proc.is_alive():
+            proc.terminate()
+    deadline = time.monotonic() + timeout
+    for proc in supervised_workers.values():
+        proc.join(max(0, deadline - time.monotonic()))
+        if proc.is_alive():
+            proc.kill()
+    supervised_workers.clear()
+
+def consume_supervised(processes=SUPERVISOR_PROCESSES, consume=None):
+    """
+    Fork `processes` workers that each run `consume` (default consume_batch)
+    in the same group_id, so partitions - and CPU-bound handlers - are spread
+    across cores instead of sharing one GIL. Needs at least as many
+    partitions as processes; extra workers sit idle as hot standbys.
+
+    Workers that crash are restarted with exponential backoff. Each worker
+    serves /metrics on METRICS_PORT + 1 + worker id; the supervisor prints
+    group-wide stats (and writes them to METRICS_JSON_PATH if set).
+    """
+    consume = consume or consume_batch
+    ctx = multiprocessing.get_context('fork')
+    stats_queue = ctx.Queue()
+    stats, restarts, started_at, restart_at = {}, {}, {}, {}
+
+    # The supervisor never consumes; leaving its consumer open would hold sockets
+    consumer.close()
+
+    def start(worker_id):
+        proc = ctx.Process(target=run_worker, args=(worker_id, consume, stats_queue),
+                           name=f'consumer-{worker_id}')
+        proc.start()
+        supervised_workers[worker_id] = proc
+        started_at[worker_id] = time.monotonic()
+
+    for worker_id in range(processes):
+        start(worker_id)
+    print(f"📡 Supervisor started {processes} consumer processes ({consume.__name__})")
+
+    next_report = time.monotonic() + SUPERVISOR_STATS_INTERVAL
+    try:
+        while supervised_workers:
+            try:
+                worker_id, snapshot = stats_queue.get(timeout=1)
+                stats[worker_id] = snapshot
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            for worker_id, proc in list(supervised_workers.items()):
+                if proc.is_alive():
+                    continue
+                if proc.exitcode == 0:  # Clean shutdown, not a crash
+                    del supervised_workers[worker_id]
+                    stats.pop(worker_id, None)
+                elif worker_id not in restart_at:
+                    # A worker that ran a while before dying starts its backoff over
+                    if now - started_at[worker_id] > SUPERVISOR_MAX_BACKOFF * 2:
+                        restarts[worker_id] = 0
+                    restarts[worker_id] = restarts.get(worker_id, 0) + 1
+                    delay = min(SUPERVISOR_MAX_BACKOFF, 2 ** (restarts[worker_id] - 1))
+                    restart_at[worker_id] = now + delay
+                    stats.pop(worker_id, None)
+                    print(f"⚠️  Worker {worker_id} exited with code {proc.exitcode}, restarting in {delay}s")
+                elif now >= restart_at[worker_id]:
+                    del restart_at[worker_id]
+                    start(worker_id)
+
+            if now >= next_report:
+                next_report = now + SUPERVISOR_STATS_INTERVAL
+                merged = merge_snapshots(list(stats.values()))
+                alive = sum(1 for proc in supervised_workers.values() if proc.is_alive())
+                print(f"📊 {alive}/{processes} workers | {merged['records_total']} records "
+                      f"({merged['records_per_second']}/s) | {merged['errors_total']} errors | "
+                      f"lag {merged['lag_total']} | {sum(restarts.values())} restarts")
+                if METRICS_JSON_PATH:
+                    write_json_atomic(METRICS_JSON_PATH, {
+                        'workers_alive': alive, 'restarts': sum(restarts.values()), **merged})
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_supervised_workers()
+        print("👋 Supervisor stopped")
+
 # ========================================
 # Main Function
 # ========================================
@@ -197,6 +1285,10 @@ def main():
     # Choose consumption method
     # consume_simple()
     # consume_batch()
+    # consume_pipelined(workers=16)
+    # asyncio.run(consume_async())
+    # consume_supervised(processes=4)  # Serves its own metrics, skip start_metrics()
+    start_metrics()
     consume_simple()
 
 # ========================================
@@ -205,6 +1297,9 @@ def main():
 
 def signal_handler(sig, frame):
     print('\n🛑 Shutting down consumer...')
+    if supervised_workers:
+        stop_supervised_workers()
+    close_dlq_producer()
     consumer.close()
     sys.exit(0)
 
@@ -216,5 +1311,4 @@ signal.signal(signal.SIGTERM, signal_handler)
 # ========================================
 
 if __name__ == '__main__':
-    import time
     main()
@@ -0,0 +1,271 @@
+"""
+End-to-end Load Test for the Python Templates
+
+Runs the producer template's pipelined sends (SendWindow) and one of the
+consumer template's consume modes in one process, against the in-process
+stand-in (local_broker.py) or the docker single-node broker on
+localhost:9092, and reports:
+
+- end-to-end latency (send -> handler) p50 / p99 / p99.9
+- sustained produce and consume throughput
+- consumer lag over time, one row per --interval
+
+Usage:
+    python load-test.py                                   # 10k msg/s for 10s, local stand-in
+    python load-test.py --rate 50000 --payload 1024 --mode pipelined
+    python load-test.py --rate 0 --duration 30            # As fast as the producer goes
+    python load-test.py --broker docker                   # docker-compose single node (kafka-python)
+    python load-test.py --json > results.json
+
+The templates are imported as-is, so their configuration (poll tuning,
+DLQ, metrics) is what gets measured. Everything runs in one process: with
+the stand-in the numbers reflect client-side cost, not network or disk.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from pathlib import Path
+
+TEMPLATES = Path(__file__).resolve().parent
+EVENT_TYPE = 'load_test'
+MODES = ('simple', 'batch', 'pipelined', 'manual', 'async')
+
+def load_template(name, filename):
+    spec = importlib.util.spec_from_file_location(name, TEMPLATES / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values)))]
+
+# ========================================
+# Load Test
+# ========================================
+
+class LoadTest:
+    """Paced producer threads, one consumer, and a lag sampler sharing counters"""
+
+    def __init__(self, args, producer_template, consumer_template):
+        self.args = args
+        self.pt = producer_template
+        self.ct = consumer_template
+        self.produced = 0
+        self.produce_done = threading.Event()
+        self.latencies = array('d')      # Seconds, appended by handler threads
+        self.samples = []                # Lag curve rows
+        self.first_consumed = self.last_consumed = None  # perf_counter() of the first / last handled record
+        self._produced_lock = threading.Lock()
+        self.padding = 'x' * max(0, args.payload - 60)  # ~60 bytes of JSON around the padding
+
+    def handle(self, data):
+        """Consumer handler: end-to-end latency from the timestamp the producer embedded"""
+        self.latencies.append((time.time_ns() - data['sentAt']) / 1e9)
+        self.last_consumed = time.perf_counter()
+        if self.first_consumed is None:
+            self.first_consumed = self.last_consumed
+
+    def produce(self, index, rate, stop_at):
+        """One producer thread: paced to `rate` msg/s (0 = unpaced) until stop_at"""
+        window = self.pt.SendWindow()
+        headers = [('event-type', EVENT_TYPE.encode())]
+        interval = 1 / rate if rate else 0
+        next_send = time.perf_counter()
+        keys = [f"key-{i}" for i in range(self.args.keys)]
+        sent = 0
+        for n in itertools.count():
+            if n & 63 == 0:
+                now = time.perf_counter()
+                if now >= stop_at:
+                    break
+                if interval and next_send > now:  # Ahead of schedule: sleep in chunks, not per record
+                    time.sleep(next_send - now)
+            window.send(self.args.topic, {'sentAt': time.time_ns(), 'pad': self.padding},
+                        keys[(index + n) % len(keys)], headers)
+            sent += 1
+            next_send += interval
+            if sent == 1000:
+                with self._produced_lock:
+                    self.produced += sent
+                sent = 0
+        window.drain()
+        with self._produced_lock:
+            self.produced += sent
+
+    def start_consumer(self):
+        ct, mode = self.ct, self.args.mode
+        ct.EVENT_HANDLERS[EVENT_TYPE] = self.handle
+
+        if mode == 'async':
+            async def handle_async(data):
+                self.handle(data)
+            ct.ASYNC_EVENT_HANDLERS[EVENT_TYPE] = handle_async
+            async_consumer = None
+            if self.args.broker == 'local':
+                import local_broker
+                async_consumer = local_broker.AIOKafkaConsumer(
+                    self.args.topic, group_id=self.args.group, auto_offset_reset='earliest',
+                    enable_auto_commit=False, max_poll_records=500,
+                    key_deserializer=lambda k: k.decode('utf-8') if k else None)
+            target = lambda: asyncio.run(ct.consume_async(async_consumer=async_consumer,
+                                                          topic=self.args.topic, group_id=self.args.group))
+        else:
+            ct.consumer.close()
+            ct.consumer = ct.create_consumer(self.args.topic, self.args.group)
+            target = {
+                'simple': ct.consume_simple,
+                'batch': ct.consume_batch,
+                'pipelined': ct.consume_pipelined,
+                'manual': ct.consume_manual_commit,
+            }[mode]
+        threading.Thread(target=target, name='consumer', daemon=True).start()
+
+    def sample(self, started):
+        """Record one lag-curve row every --interval until the run ends"""
+        last_produced = last_consumed = 0
+        last_time = started
+        while True:
+            time.sleep(self.args.interval)
+            now = time.perf_counter()
+            produced, consumed = self.produced, len(self.latencies)
+            window = sorted(self.latencies[last_consumed:consumed])
+            self.samples.append({
+                'elapsed': round(now - started, 2),
+                'produced_per_second': round((produced - last_produced) / (now - last_time)),
+                'consumed_per_second': round((consumed - last_consumed) / (now - last_time)),
+                'lag': max(0, produced - consumed),
+                'p99_ms': round(percentile(window, 99) * 1000, 2),
+            })
+            if not self.args.json:
+                row = self.samples[-1]
+                print(f"{row['elapsed']:>7.1f}s {row['produced_per_second']:>12,} {row['consumed_per_second']:>12,} "
+                      f"{row['lag']:>10,} {row['p99_ms']:>10.2f}")
+            last_produced, last_consumed, last_time = produced, consumed, now
+            if self.produce_done.is_set() and consumed >= produced:
+                return
+
+    def run(self):
+        args = self.args
+        self.start_consumer()
+
+        if not args.json:
+            print(f"{args.producers} producer(s) at {args.rate or 'max'} msg/s, {args.payload} B payloads, "
+                  f"{args.mode} consumer, {args.broker} broker, {args.duration}s\n")
+            print(f"{'time':>8} {'produced/s':>12} {'consumed/s':>12} {'lag':>10} {'p99 ms':>10}")
+            print("-" * 56)
+
+        started = time.perf_counter()
+        stop_at = started + args.duration
+        per_producer = args.rate / args.producers if args.rate else 0
+        producers = [threading.Thread(target=self.produce, args=(i, per_producer, stop_at), daemon=True)
+                     for i in range(args.producers)]
+        sampler = threading.Thread(target=self.sample, args=(started,), daemon=True)
+        for thread in producers:
+            thread.start()
+        sampler.start()
+
+        for thread in producers:
+            thread.join()
+        produce_seconds = time.perf_counter() - started
+        self.produce_done.set()
+        sampler.join(args.drain + args.interval)
+        if self.first_consumed is not None and self.last_consumed > self.first_consumed:
+            consume_seconds = self.last_consumed - self.first_consumed
+        else:
+            consume_seconds = time.perf_counter() - started
+
+        latencies = sorted(self.latencies)
+        return {
+            'config': {k: v for k, v in vars(args).items() if k != 'json'},
+            'produced': self.produced,
+            'consumed': len(latencies),
+            'produce_per_second': round(self.produced / produce_seconds),
+            'consume_per_second': round(len(latencies) / consume_seconds),
+            'drained': len(latencies) >= self.produced,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50) * 1000, 3),
+                'p99': round(percentile(latencies, 99) * 1000, 3),
+                'p999': round(percentile(latencies, 99.9) * 1000, 3),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+            'max_lag': max((s['lag'] for s in self.samples), default=0),
+            'lag_curve': self.samples,
+            'producer_ack_p99_seconds': {
+                topic: stats['latency_p99_seconds']
+                for topic, stats in self.pt.metrics.snapshot()['topics'].items()
+            },
+            'consumer_poll_records_p50': self.ct.metrics.snapshot()['poll_records_p50'],
+        }
+
+# ========================================
+# Main Function
+# ========================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='End-to-end load test of the Python Kafka templates')
+    parser.add_argument('--broker', choices=('local', 'docker'), default='local',
+                        help='In-process stand-in, or the docker single node on localhost:9092 (default: local)')
+    parser.add_argument('--rate', type=float, default=10000, help='Total msg/s, 0 for unpaced (default: 10000)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to produce (default: 10)')
+    parser.add_argument('--payload', type=int, default=256, help='Approximate message size in bytes (default: 256)')
+    parser.add_argument('--producers', type=int, default=1, help='Producer threads (default: 1)')
+    parser.add_argument('--keys', type=int, default=1000, help='Distinct message keys (default: 1000)')
+    parser.add_argument('--mode', choices=MODES, default='batch', help='Consumer mode (default: batch)')
+    parser.add_argument('--partitions', type=int, default=6, help='Partitions (local broker only, default: 6)')
+    parser.add_argument('--topic', default='load-test', help='Topic (default: load-test)')
+    parser.add_argument('--group', default='load-test', help='Consumer group (default: load-test)')
+    parser.add_argument('--interval', type=float, default=1, help='Seconds per lag-curve row (default: 1)')
+    parser.add_argument('--drain', type=float, default=30, help='Seconds to wait for lag to reach 0 (default: 30)')
+    parser.add_argument('--verbose', action='store_true', help="Keep the templates' own output")
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    if args.producers < 1 or args.keys < 1:
+        parser.error("--producers and --keys must be at least 1")
+    return args
+
+def main():
+    args = parse_args()
+
+    if args.broker == 'local':
+        os.environ['KAFKA_LOCAL_BROKER'] = '1'
+        sys.path.insert(0, str(TEMPLATES))
+        import local_broker
+        local_broker.reset_broker(args.partitions)
+
+    producer_template = load_template('producer_template', 'producer-python.py')
+    consumer_template = load_template('consumer_template', 'consumer-python.py')
+    # Offset-keyed dedup rows from an earlier run would skip this run's records (--mode manual)
+    dedup_dir = tempfile.TemporaryDirectory(prefix='load-test-')
+    consumer_template.DEDUP_DB_PATH = os.path.join(dedup_dir.name, 'consumer-dedup.db')
+    if not args.verbose:
+        # Per-batch / per-event output would dominate both the terminal and the measurement
+        producer_template.print = consumer_template.print = lambda *a, **k: None
+        consumer_template.log.rate = 0
+
+    results = LoadTest(args, producer_template, consumer_template).run()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    latency = results['latency_ms']
+    print(f"\nProduced {results['produced']:,} ({results['produce_per_second']:,}/s), "
+          f"consumed {results['consumed']:,} ({results['consume_per_second']:,}/s)"
+          f"{'' if results['drained'] else '  ⚠️  lag not drained'}")
+    print(f"End-to-end latency: p50 {latency['p50']} ms, p99 {latency['p99']} ms, "
+          f"p99.9 {latency['p999']} ms, max {latency['max']} ms")
+    print(f"Max lag: {results['max_lag']:,} records")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,539 @@
+"""
+In-process Kafka Stand-in (Python)
+
+A partitioned in-memory log with kafka-python-style (KafkaProducer,
+KafkaConsumer) and aiokafka-style (AIOKafkaProducer, AIOKafkaConsumer)
+clients, so the Python templates can be exercised and load-tested
+without a cluster.
+
+Usage:
+    KAFKA_LOCAL_BROKER=1 python consumer-python.py
+
+Or directly:
+    from local_broker import LocalBroker, KafkaProducer, KafkaConsumer
+    broker = LocalBroker(partitions=6)
+    producer = KafkaProducer(broker=broker, value_serializer=...)
+
+Only the subset of the client APIs used by the templates is implemented.
+Unknown client configuration (bootstrap_servers, SASL, tuning) is accepted
+and ignored. Everything runs in one process; consumer groups balance
+partitions across consumers created in that process.
+"""
+
+from collections import namedtuple
+import asyncio
+import inspect
+import itertools
+import threading
+import time
+
+# ========================================
+# Records and Metadata
+# ========================================
+
+TopicPartition = namedtuple('TopicPartition', ['topic', 'partition'])
+OffsetAndMetadata = namedtuple('OffsetAndMetadata', ['offset', 'metadata'])
+RecordMetadata = namedtuple('RecordMetadata', [
+    'topic', 'partition', 'offset', 'timestamp',
+    'serialized_key_size', 'serialized_value_size'
+])
+ConsumerRecord = namedtuple('ConsumerRecord', [
+    'topic', 'partition', 'offset', 'timestamp', 'timestamp_type',
+    'key', 'value', 'headers', 'checksum',
+    'serialized_key_size', 'serialized_value_size', 'serialized_header_size'
+])
+
+DEFAULT_PARTITIONS = 3
+
+class KafkaError(Exception):
+    """Stand-in for kafka.errors.KafkaError"""
+
+class IllegalStateError(KafkaError):
+    """Stand-in for aiokafka.errors.IllegalStateError"""
+
+# ========================================
+# Broker
+# ========================================
+
+class LocalBroker:
+    """
+    Thread-safe partitioned log with committed offsets per consumer group.
+
+    Each partition is a list of (timestamp, key, value, headers) tuples
+    holding raw bytes; the list index is the offset.
+    """
+
+    def __init__(self, partitions=DEFAULT_PARTITIONS):
+        self.default_partitions = partitions
+        self._topics = {}        # topic -> [partition log, ...]
+        self._committed = {}     # (group_id, TopicPartition) -> offset
+        self._groups = {}        # group_id -> [member, ...]
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    # Topics
+
+    def create_topic(self, topic, partitions=None):
+        with self._cond:
+            if topic not in self._topics:
+                self._topics[topic] = [[] for _ in range(partitions or self.default_partitions)]
+            return len(self._topics[topic])
+
+    def partitions_for(self, topic):
+        self.create_topic(topic)
+        with self._cond:
+            return set(range(len(self._topics[topic])))
+
+    def topics(self):
+        with self._cond:
+            return set(self._topics)
+
+    # Log
+
+    def append(self, topic, partition, key, value, headers=None, timestamp=None):
+        """Append raw bytes; returns (offset, timestamp)"""
+        self.create_topic(topic)
+        timestamp = timestamp if timestamp is not None else int(time.time() * 1000)
+        with self._cond:
+            log = self._topics[topic][partition]
+            log.append((timestamp, key, value, list(headers or [])))
+            self._cond.notify_all()
+            return len(log) - 1, timestamp
+
+    def fetch(self, tp, offset, max_records):
+        with self._cond:
+            log = self._topics[tp.topic][tp.partition]
+            return [(offset + i, entry) for i, entry in enumerate(log[offset:offset + max_records])]
+
+    def end_offset(self, tp):
+        with self._cond:
+            return len(self._topics[tp.topic][tp.partition])
+
+    def wait_for_data(self, timeout):
+        """Block until something is appended or timeout (seconds) passes"""
+        with self._cond:
+            self._cond.wait(timeout)
+
+    # Consumer groups
+
+    def join(self, group_id, member):
+        with self._cond:
+            self._groups.setdefault(group_id, []).append(member)
+            self._generation += 1
+
+    def leave(self, group_id, member):
+        with self._cond:
+            members = self._groups.get(group_id, [])
+            if member in members:
+                members.remove(member)
+                self._generation += 1
+
+    def generation(self):
+        with self._cond:
+            return self._generation
+
+    def assignment(self, group_id, member, topics):
+        """Round-robin partitions of topics across the group's members"""
+        for topic in topics:
+            self.create_topic(topic)
+        with self._cond:
+            members = self._groups.get(group_id, [member])
+            index = members.index(member) if member in members else 0
+            all_tps = [TopicPartition(t, p) for t in sorted(topics) for p in range(len(self._topics[t]))]
+            return set(all_tps[index::len(members)])
+
+    def commit(self, group_id, offsets):
+        with self._cond:
+            for tp, offset in offsets.items():
+                self._committed[(group_id, tp)] = offset
+
+    def committed(self, group_id, tp):
+        with self._cond:
+            return self._committed.get((group_id, tp))
+
+_default_broker = LocalBroker()
+
+def get_broker():
+    """Broker shared by clients created without an explicit broker="""
+    return _default_broker
+
+def reset_broker(partitions=DEFAULT_PARTITIONS):
+    """Replace the shared broker (e.g. between test runs)"""
+    global _default_broker
+    _default_broker = LocalBroker(partitions)
+    return _default_broker
+
+# ========================================
+# Producer
+# ========================================
+
+class Future:
+    """Already-completed future with kafka-python's callback API"""
+
+    def __init__(self, value=None, exception=None):
+        self.value = value
+        self.exception = exception
+        self.is_done = True  # Attribute, as in kafka-python
+
+    def succeeded(self):
+        return self.exception is None
+
+    def failed(self):
+        return self.exception is not None
+
+    def get(self, timeout=None):
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+    def add_callback(self, fn, *args, **kwargs):
+        if self.exception is None:
+            fn(*args, self.value, **kwargs)
+        return self
+
+    def add_errback(self, fn, *args, **kwargs):
+        if self.exception is not None:
+            fn(*args, self.exception, **kwargs)
+        return self
+
+    def add_both(self, fn, *args, **kwargs):
+        fn(*args, self.value if self.exception is None else self.exception, **kwargs)
+        return self
+
+def murmur2(data):
+    """Kafka's murmur2 key hash (same partition for a key as the Java and kafka-python clients)"""
+    length = len(data)
+    m = 0x5bd1e995
+    h = (0x9747b28c ^ length) & 0xffffffff
+    for i in range(0, length - length % 4, 4):
+        k = data[i] | (data[i + 1] << 8) | (data[i + 2] << 16) | (data[i + 3] << 24)
+        k = (k * m) & 0xffffffff
+        k ^= k >> 24
+        k = (k * m) & 0xffffffff
+        h = ((h * m) & 0xffffffff) ^ k
+    tail = length & ~3
+    extra = length % 4
+    if extra >= 3:
+        h ^= data[tail + 2] << 16
+    if extra >= 2:
+        h ^= data[tail + 1] << 8
+    if extra >= 1:
+        h ^= data[tail]
+        h = (h * m) & 0xffffffff
+    h ^= h >> 13
+    h = (h * m) & 0xffffffff
+    h ^= h >> 15
+    return h
+
+def default_partition(key_bytes, partition_count, counter):
+    """murmur2 of the key as in Kafka, round-robin for unkeyed records"""
+    if key_bytes is None:
+        return next(counter) % partition_count
+    return (murmur2(key_bytes) & 0x7fffffff) % partition_count
+
+class _ProducerCore:
+    def __init__(self, broker=None, key_serializer=None, value_serializer=None, partitioner=None, **config):
+        self.broker = broker or get_broker()
+        self.config = dict(config)
+        self._key_serializer = key_serializer
+        self._value_serializer = value_serializer
+        self._partitioner = partitioner
+        self._counter = itertools.count()
+        self._closed = False
+
+    def _append(self, topic, value=None, key=None, headers=None, partition=None, timestamp_ms=None):
+        if self._closed:
+            raise KafkaError("Producer is closed")
+        key_bytes = self._key_serializer(key) if self._key_serializer and key is not None else key
+        value_bytes = self._value_serializer(value) if self._value_serializer and value is not None else value
+        partitions = sorted(self.broker.partitions_for(topic))
+
+        if partition is None:
+            if self._partitioner is not None:
+                partition = self._partitioner(key_bytes, partitions, partitions)
+            else:
+                partition = default_partition(key_bytes, len(partitions), self._counter)
+
+        offset, timestamp = self.broker.append(topic, partition, key_bytes, value_bytes, headers, timestamp_ms)
+        return RecordMetadata(
+            topic, partition, offset, timestamp,
+            len(key_bytes) if key_bytes is not None else -1,
+            len(value_bytes) if value_bytes is not None else -1
+        )
+
+class KafkaProducer(_ProducerCore):
+    """kafka-python-style producer; sends complete synchronously"""
+
+    def send(self, topic, value=None, key=None, headers=None, partition=None, timestamp_ms=None):
+        try:
+            return Future(self._append(topic, value, key, headers, partition, timestamp_ms))
+        except KafkaError as e:
+            return Future(exception=e)
+
+    def flush(self, timeout=None):
+        pass
+
+    def partitions_for(self, topic):
+        return self.broker.partitions_for(topic)
+
+    def close(self, timeout=None):
+        self._closed = True
+
+class AIOKafkaProducer(_ProducerCore):
+    """aiokafka-style producer"""
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        self._closed = True
+
+    async def send(self, topic, value=None, key=None, partition=None, timestamp_ms=None, headers=None):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            future.set_result(self._append(topic, value, key, headers, partition, timestamp_ms))
+        except KafkaError as e:
+            future.set_exception(e)
+        return future
+
+    async def send_and_wait(self, topic, value=None, key=None, partition=None, timestamp_ms=None, headers=None):
+        return await (await self.send(topic, value, key, partition, timestamp_ms, headers))
+
+    async def flush(self):
+        pass
+
+# ========================================
+# Consumer
+# ========================================
+
+class ConsumerRebalanceListener:
+    """Callbacks around partition reassignment (eager: all partitions revoked, then the new set assigned)"""
+
+    def on_partitions_revoked(self, revoked):
+        pass
+
+    def on_partitions_assigned(self, assigned):
+        pass
+
+class _ConsumerCore:
+    def __init__(self, *topics, broker=None, group_id=None, key_deserializer=None,
+                 value_deserializer=None, auto_offset_reset='latest', enable_auto_commit=True,
+                 max_poll_records=500, **config):
+        self.broker = broker or get_broker()
+        self.group_id = group_id
+        self._key_deserializer = key_deserializer
+        self._value_deserializer = value_deserializer
+        self._auto_offset_reset = auto_offset_reset
+        self._max_poll_records = max_poll_records
+        self._enable_auto_commit = enable_auto_commit
+        # Read-only view like KafkaConsumer.config: changing it afterwards has no effect
+        self.config = dict(config, enable_auto_commit=enable_auto_commit, group_id=group_id)
+        self._topics = set()
+        self._listener = None
+        self._generation = None
+        self._assignment = set()
+        self._positions = {}
+        self._paused = set()
+        self._closed = False
+        if topics:
+            self.subscribe(topics)
+
+    def subscribe(self, topics=(), pattern=None, listener=None):
+        if not self._topics:
+            self.broker.join(self.group_id, self)
+        self._topics = set(topics)
+        self._listener = listener
+        self._generation = None
+
+    def subscription(self):
+        return set(self._topics)
+
+    def _rebalance(self):
+        """Yields (listener callback, partitions) for each step of a pending rebalance"""
+        generation = self.broker.generation()
+        if generation == self._generation:
+            return
+        previous, self._generation = self._generation, generation
+        if self._listener and previous is not None:
+            yield self._listener.on_partitions_revoked, set(self._assignment)
+        self._assignment = self.broker.assignment(self.group_id, self, self._topics)
+        # Like the real client, positions restart from committed offsets after a rebalance
+        self._positions = {}
+        self._paused &= self._assignment
+        for tp in self._assignment:
+            committed = self.broker.committed(self.group_id, tp)
+            if committed is not None:
+                self._positions[tp] = committed
+            elif self._auto_offset_reset == 'earliest':
+                self._positions[tp] = 0
+            else:
+                self._positions[tp] = self.broker.end_offset(tp)
+        if self._listener:
+            yield self._listener.on_partitions_assigned, set(self._assignment)
+
+    def _sync_assignment(self):
+        for callback, partitions in self._rebalance():
+            callback(partitions)
+
+    def _to_record(self, tp, offset, entry):
+        timestamp, key, value, headers = entry
+        return ConsumerRecord(
+            tp.topic, tp.partition, offset, timestamp, 0,
+            self._key_deserializer(key) if self._key_deserializer and key is not None else key,
+            self._value_deserializer(value) if self._value_deserializer and value is not None else value,
+            headers, None,
+            len(key) if key is not None else -1,
+            len(value) if value is not None else -1,
+            -1
+        )
+
+    def _fetch(self, max_records):
+        if self._closed:
+            raise KafkaError("Consumer is closed")
+        self._sync_assignment()
+        batch = {}
+        remaining = max_records or self._max_poll_records
+        for tp in sorted(self._assignment - self._paused):
+            if remaining <= 0:
+                break
+            entries = self.broker.fetch(tp, self._positions[tp], remaining)
+            if entries:
+                batch[tp] = [self._to_record(tp, offset, entry) for offset, entry in entries]
+                self._positions[tp] = entries[-1][0] + 1
+                remaining -= len(entries)
+        if batch and self._enable_auto_commit:
+            self.broker.commit(self.group_id, {tp: self._positions[tp] for tp in batch})
+        return batch
+
+    @staticmethod
+    def _normalize_offsets(offsets):
+        # Accept ints, OffsetAndMetadata and kafka-python 2.1+ 3-field tuples
+        return {tp: o if isinstance(o, int) else o[0] for tp, o in offsets.items()}
+
+    def assignment(self):
+        self._sync_assignment()
+        return set(self._assignment)
+
+    def pause(self, *partitions):
+        self._paused.update(partitions)
+
+    def resume(self, *partitions):
+        self._paused.difference_update(partitions)
+
+    def paused(self):
+        return set(self._paused)
+
+    def position(self, tp):
+        self._sync_assignment()
+        return self._positions[tp]
+
+    def seek(self, tp, offset):
+        self._positions[tp] = offset
+
+    def _end_offsets(self, partitions):
+        return {tp: self.broker.end_offset(tp) for tp in partitions}
+
+    def _committed(self, tp):
+        return self.broker.committed(self.group_id, tp)
+
+    def _close(self):
+        if not self._closed:
+            self._closed = True
+            self.broker.leave(self.group_id, self)
+
+class KafkaConsumer(_ConsumerCore):
+    """kafka-python-style consumer"""
+
+    def poll(self, timeout_ms=0, max_records=None, update_offsets=True):
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            batch = self._fetch(max_records)
+            remaining = deadline - time.monotonic()
+            if batch or remaining <= 0:
+                return batch
+            self.broker.wait_for_data(min(remaining, 0.05))
+
+    def __iter__(self):
+        while not self._closed:
+            for messages in self.poll(timeout_ms=1000).values():
+                yield from messages
+
+    def commit(self, offsets=None):
+        if offsets is None:
+            offsets = {tp: self._positions[tp] for tp in self._assignment}
+        self.broker.commit(self.group_id, self._normalize_offsets(offsets))
+
+    def commit_async(self, offsets=None, callback=None):
+        try:
+            self.commit(offsets)
+            result = None
+        except KafkaError as e:
+            result = e
+        if callback:
+            callback(offsets, result)
+        return Future(result)
+
+    def committed(self, tp):
+        return self._committed(tp)
+
+    def end_offsets(self, partitions):
+        return self._end_offsets(partitions)
+
+    def close(self, autocommit=True):
+        self._close()
+
+class AIOKafkaConsumer(_ConsumerCore):
+    """aiokafka-style consumer"""
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        self._close()
+
+    def _sync_assignment(self):
+        pass  # Rebalances only run inside getmany(), where listener coroutines can be awaited
+
+    async def _sync_assignment_async(self):
+        for callback, partitions in self._rebalance():
+            result = callback(partitions)
+            if inspect.isawaitable(result):
+                await result
+
+    async def getmany(self, *partitions, timeout_ms=0, max_records=None):
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            await self._sync_assignment_async()
+            batch = self._fetch(max_records)
+            if partitions:
+                batch = {tp: msgs for tp, msgs in batch.items() if tp in partitions}
+            if batch or time.monotonic() >= deadline:
+                return batch
+            await asyncio.sleep(0.005)
+
+    async def getone(self):
+        while True:
+            for messages in (await self.getmany(timeout_ms=1000, max_records=1)).values():
+                return messages[0]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+        return await self.getone()
+
+    async def commit(self, offsets=None):
+        if offsets is None:
+            offsets = {tp: self._positions[tp] for tp in self._assignment}
+        for tp in offsets:
+            if tp not in self._assignment:
+                raise IllegalStateError(f"Partition {tp} is not assigned")
+        self.broker.commit(self.group_id, self._normalize_offsets(offsets))
+
+    async def committed(self, tp):
+        return self._committed(tp)
+
+    async def end_offsets(self, partitions):
+        return self._end_offsets(partitions)
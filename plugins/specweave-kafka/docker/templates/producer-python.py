@@ -2,26 +2,195 @@
 Kafka Producer Example (Python)
 
 Install: pip install kafka-python
+
+Local testing without a cluster:
+         KAFKA_LOCAL_BROKER=1 python producer-python.py
 """
 
-from kafka import KafkaProducer
-from kafka.errors import KafkaError
+import os
+
+if os.environ.get('KAFKA_LOCAL_BROKER'):
+    # In-process stand-in with the same client APIs (see local_broker.py)
+    from local_broker import KafkaProducer, KafkaError, murmur2
+else:
+    from kafka import KafkaProducer
+    from kafka.errors import KafkaError
+    from kafka.partitioner.default import murmur2
+
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import bisect
+import csv
+import hashlib
+import io
+import itertools
 import json
+import mmap
 import time
 import signal
 import sys
+import threading
+
+try:
+    import orjson  # Optional: pip install orjson (faster key extraction during ingestion)
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# ========================================
+# Partitioning
+# ========================================
+
+HOT_KEY_SHARE = 0.05            # A key is hot above this share of recent records...
+HOT_KEY_MIN_COUNT = 1000        # ...once it has at least this many
+SPLITTABLE_KEYS = set()         # Keys (str) that need no ordering, spread when hot, e.g. {'tenant-big'}
+HOT_KEY_SPREAD = 4              # Partitions a hot splittable key is spread over
+STICKY_RECORDS = 200            # Unkeyed records sent to one partition before switching
+RATE_WINDOW_SECONDS = 10        # Window for partition send rates and key counts (older counts decay)
+
+class CountMinSketch:
+    """Approximate per-key counts in fixed memory; never underestimates"""
+
+    def __init__(self, width=4096, depth=4):
+        self.mask = width - 1  # width must be a power of two
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def add(self, key):
+        """Count one occurrence of key (bytes) and return its estimate"""
+        h = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+        cells = [(row, (h >> (16 * i)) & self.mask) for i, row in enumerate(self.rows)]
+        estimate = min(row[i] for row, i in cells) + 1
+        for row, i in cells:  # Conservative update: only raise counters below the new estimate
+            if row[i] < estimate:
+                row[i] = estimate
+        return estimate
+
+    def decay(self):
+        for row in self.rows:
+            row[:] = [count >> 1 for count in row]
+
+class LoadAwarePartitioner:
+    """
+    kafka-python partitioner (key_bytes, all_partitions, available) that:
+
+    - places keyed records like the default partitioner (murmur2), so
+      per-key ordering and placement match other clients
+    - counts keys in a count-min sketch and flags hot keys; hot keys in
+      SPLITTABLE_KEYS are spread over HOT_KEY_SPREAD partitions
+    - sends unkeyed records to one partition for STICKY_RECORDS records
+      (fuller batches), then moves to the least-loaded partition
+    - tracks records/sec per partition so skew is visible
+
+    kafka-python does not pass the topic to partitioners, so rates are per
+    partition number across every topic this producer writes to.
+    """
+
+    def __init__(self, splittable_keys=SPLITTABLE_KEYS, hot_share=HOT_KEY_SHARE,
+                 hot_min_count=HOT_KEY_MIN_COUNT, spread=HOT_KEY_SPREAD,
+                 sticky_records=STICKY_RECORDS, window_seconds=RATE_WINDOW_SECONDS):
+        self.splittable = {k.encode('utf-8') if isinstance(k, str) else k for k in splittable_keys}
+        self.hot_share = hot_share
+        self.hot_min_count = hot_min_count
+        self.spread = spread
+        self.sticky_records = sticky_records
+        self.window_seconds = window_seconds
+        self.sketch = CountMinSketch()
+        self.hot_keys = {}        # key -> estimated records in the (decayed) window
+        self.keyed_total = 0      # Decays with the sketch
+        self.sent = {}            # partition -> records in the current window
+        self.rates = {}           # partition -> records/sec over the last full window
+        self._window_start = time.monotonic()
+        self._partitions = ()     # Last partition list seen, so idle partitions show up as 0/s
+        self._sticky = None
+        self._sticky_left = 0
+        self._spread_counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self, key, all_partitions, available):
+        with self._lock:
+            self._partitions = all_partitions
+            now = time.monotonic()
+            if now - self._window_start >= self.window_seconds:
+                self._roll_window(now)
+
+            if key is None:
+                partition = self._sticky_partition(available or all_partitions)
+            else:
+                index = (murmur2(key) & 0x7fffffff) % len(all_partitions)
+                self.keyed_total += 1
+                count = self.sketch.add(key)
+                if count >= self.hot_min_count and count >= self.hot_share * self.keyed_total:
+                    self.hot_keys[key] = count
+                    if key in self.splittable:
+                        index += next(self._spread_counter) % min(self.spread, len(all_partitions))
+                partition = all_partitions[index % len(all_partitions)]
+
+            self.sent[partition] = self.sent.get(partition, 0) + 1
+            return partition
+
+    def _sticky_partition(self, candidates):
+        if self._sticky_left <= 0 or self._sticky not in candidates:
+            self._sticky = min(candidates, key=lambda p: self.sent.get(p, 0))
+            self._sticky_left = self.sticky_records
+        self._sticky_left -= 1
+        return self._sticky
+
+    def _roll_window(self, now):
+        elapsed = now - self._window_start
+        self.rates = {p: count / elapsed for p, count in self.sent.items()}
+        self.sent = {}
+        self._window_start = now
+        self.sketch.decay()
+        self.keyed_total >>= 1
+        threshold = max(self.hot_min_count, self.hot_share * self.keyed_total)
+        self.hot_keys = {k: c >> 1 for k, c in self.hot_keys.items() if c >> 1 >= threshold}
+
+    def report(self):
+        """Per-partition records/sec, skew (busiest / mean) and hot keys"""
+        with self._lock:
+            rates = self.rates
+            if not rates:  # First window still open
+                elapsed = max(time.monotonic() - self._window_start, 1e-9)
+                rates = {p: count / elapsed for p, count in self.sent.items()}
+            rates = {**{p: 0.0 for p in self._partitions}, **rates}
+            hot = sorted(self.hot_keys.items(), key=lambda x: -x[1])
+        mean = sum(rates.values()) / len(rates) if rates else 0
+        return {
+            'partition_rates': {p: round(r, 1) for p, r in sorted(rates.items())},
+            'skew': round(max(rates.values()) / mean, 2) if mean else 0.0,
+            'hot_keys': [(k.decode('utf-8', errors='replace'), c) for k, c in hot],
+        }
+
+def print_partition_report():
+    report = partitioner.report()
+    print(f"📊 Partition skew {report['skew']}x (busiest partition vs mean)")
+    for p, rate in report['partition_rates'].items():
+        print(f"   partition {p}: {rate:,.1f} records/s")
+    for key, count in report['hot_keys']:
+        spread = ' (spread)' if key.encode('utf-8') in partitioner.splittable else ''
+        print(f"   🔥 hot key {key}: ~{count:,} records{spread}")
+
+partitioner = LoadAwarePartitioner()
 
 # ========================================
 # Configuration
 # ========================================
 
+def serialize_value(value):
+    """JSON-encode values; already-encoded bytes (e.g. raw NDJSON lines) pass through"""
+    if isinstance(value, bytes):
+        return value
+    return json.dumps(value).encode('utf-8')
+
 producer = KafkaProducer(
     bootstrap_servers=['localhost:9092'],
     client_id='my-app',
 
     # Serialization
     key_serializer=lambda k: k.encode('utf-8') if k else None,
-    value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+    value_serializer=serialize_value,
+    partitioner=partitioner,  # Hot-key aware; see LoadAwarePartitioner
 
     # Performance tuning
     compression_type='lz4',  # 'gzip', 'snappy', 'lz4', 'zstd'
@@ -35,6 +204,7 @@ producer = KafkaProducer(
     # Retries
     retries=3,
     max_in_flight_requests_per_connection=5,
+    max_block_ms=60000,      # send() blocks this long when buffer_memory is full
 
     # Optional: SASL/SSL (for production)
     # security_protocol='SASL_SSL',
@@ -43,14 +213,248 @@ producer = KafkaProducer(
     # sasl_plain_password='password'
 )
 
+# Pipelined sends (SendWindow)
+SEND_WINDOW = 10000             # Unacknowledged records before send() blocks
+SEND_TIMEOUT = 30               # Seconds to wait on the oldest record when the window is full
+
+# Streaming ingestion (produce_stream, --ingest)
+PROGRESS_EVERY = 5              # Seconds between progress lines
+CHECKPOINT_EVERY = 500000       # Records between flush + delivery checkpoints (0 = only at the end)
+READ_BUFFER = 1 << 20           # Buffered read size for CSV and stdin
+BAD_LINES_REPORTED = 10         # NDJSON lines skipped with --key-field that are reported by number
+
+# Value format (see serializers.py)
+VALUE_FORMAT = 'json'           # 'json', 'msgpack' or 'avro' (schema id sent in headers)
+VALUE_SCHEMA = None             # Avro record schema (dict) when VALUE_FORMAT = 'avro'
+VALUE_SUBJECT = 'my-topic-value'
+SCHEMA_REGISTRY_PATH = 'schema-registry.db'
+
+# Metrics
+# Prometheus scrape endpoint (/metrics), 0 to disable. Below the consumer's 9464 and the
+# supervisor workers' ports above it, so producer and consumers can share a host
+METRICS_PORT = int(os.environ.get('PRODUCER_METRICS_PORT', 9463))
+METRICS_JSON_PATH = None        # e.g. 'producer-metrics.json' for periodic JSON dumps
+METRICS_JSON_INTERVAL = 10      # Seconds between JSON dumps
+CLIENT_METRICS = (              # kafka-python producer.metrics() values worth watching
+    'batch-size-avg', 'batch-size-max', 'records-per-request-avg', 'compression-rate-avg',
+    'record-queue-time-avg', 'request-latency-avg', 'request-latency-max',
+    'record-retry-rate', 'record-error-rate', 'requests-in-flight', 'bufferpool-wait-ratio',
+)
+
+if VALUE_FORMAT == 'json':
+    value_codec = None  # value_serializer handles JSON, no extra headers
+else:
+    from serializers import LocalSchemaRegistry, ValueCodec
+    value_codec = ValueCodec(VALUE_FORMAT, LocalSchemaRegistry(SCHEMA_REGISTRY_PATH),
+                             VALUE_SUBJECT, VALUE_SCHEMA)
+
+# ========================================
+# Metrics
+# ========================================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (Prometheus cumulative semantics)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (largest finite bound on overflow)"""
+        with self._lock:
+            target, seen = q * self.count, 0
+            for bound, count in zip(self.buckets + (self.buckets[-1],), self.counts):
+                seen += count
+                if count and seen >= target:
+                    return bound
+            return 0.0
+
+    def prometheus(self, name, labels=''):
+        lines, cumulative = [], 0
+        prefix, suffix = (f'{labels},', f'{{{labels}}}') if labels else ('', '')
+        with self._lock:
+            for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{suffix} {self.total}')
+            lines.append(f'{name}_count{suffix} {self.count}')
+        return lines
+
+class ProducerMetrics:
+    """
+    Enqueue-to-ack latency per topic, records and bytes acknowledged per
+    topic, failures by topic and error class, and records in flight.
+
+    Buffer pressure is estimated as in-flight records x average record
+    size against buffer_memory; kafka-python's own bufferpool-wait-ratio,
+    batch sizes and retry rate are included from producer.metrics().
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.latency = {}       # topic -> Histogram
+        self.records = {}       # topic -> acknowledged records
+        self.bytes = {}         # topic -> acknowledged key + value bytes
+        self.errors = {}        # (topic, error class) -> count
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def record_enqueued(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def record_delivery(self, topic, started, result):
+        """Future callback (add_both): RecordMetadata on success, the exception on failure"""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.in_flight -= 1
+            if isinstance(result, Exception):
+                error = (topic, type(result).__name__)
+                self.errors[error] = self.errors.get(error, 0) + 1
+                return
+            histogram = self.latency.get(topic)
+            if histogram is None:
+                histogram = self.latency[topic] = Histogram()
+            self.records[topic] = self.records.get(topic, 0) + 1
+            self.bytes[topic] = (self.bytes.get(topic, 0) + max(0, result.serialized_key_size)
+                                 + max(0, result.serialized_value_size))
+        histogram.observe(elapsed)
+
+    def client_metrics(self):
+        client = getattr(producer, 'metrics', None)
+        group = client().get('producer-metrics', {}) if client else {}
+        return {name: group[name] for name in CLIENT_METRICS if name in group}
+
+    def snapshot(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        records, size = sum(self.records.values()), sum(self.bytes.values())
+        buffer_memory = producer.config.get('buffer_memory', 33554432)
+        avg_record = size / records if records else 0
+        return {
+            'uptime_seconds': round(elapsed, 1),
+            'records_total': records,
+            'records_per_second': round(records / elapsed, 1),
+            'bytes_per_second': round(size / elapsed, 1),
+            'in_flight': self.in_flight,
+            'buffer_utilization_estimate': round(min(1.0, self.in_flight * avg_record / buffer_memory), 4),
+            'errors': {f"{topic}:{error}": count for (topic, error), count in sorted(self.errors.items())},
+            'topics': {
+                topic: {
+                    'records': self.records.get(topic, 0),
+                    'bytes': self.bytes.get(topic, 0),
+                    'latency_p50_seconds': histogram.quantile(0.5),
+                    'latency_p99_seconds': histogram.quantile(0.99),
+                }
+                for topic, histogram in sorted(self.latency.items())
+            },
+            'partitions': partitioner.report(),
+            'client': self.client_metrics(),
+        }
+
+    def prometheus(self):
+        lines = [
+            '# TYPE kafka_producer_records_total counter',
+            *(f'kafka_producer_records_total{{topic="{t}"}} {c}' for t, c in sorted(self.records.items())),
+            '# TYPE kafka_producer_bytes_total counter',
+            *(f'kafka_producer_bytes_total{{topic="{t}"}} {c}' for t, c in sorted(self.bytes.items())),
+            '# TYPE kafka_producer_errors_total counter',
+            *(f'kafka_producer_errors_total{{topic="{t}",error="{e}"}} {c}'
+              for (t, e), c in sorted(self.errors.items())),
+            '# TYPE kafka_producer_in_flight gauge',
+            f'kafka_producer_in_flight {self.in_flight}',
+            '# TYPE kafka_producer_delivery_latency_seconds histogram',
+        ]
+        for topic, histogram in sorted(self.latency.items()):
+            lines.extend(histogram.prometheus('kafka_producer_delivery_latency_seconds', f'topic="{topic}"'))
+        report = partitioner.report()
+        lines.append('# TYPE kafka_producer_partition_records_per_second gauge')
+        lines.extend(f'kafka_producer_partition_records_per_second{{partition="{p}"}} {rate}'
+                     for p, rate in report['partition_rates'].items())
+        lines.append('# TYPE kafka_producer_partition_skew gauge')
+        lines.append(f"kafka_producer_partition_skew {report['skew']}")
+        lines.append('# TYPE kafka_producer_client gauge')
+        lines.extend(f'kafka_producer_client{{name="{name}"}} {value}'
+                     for name, value in self.client_metrics().items())
+        return '\n'.join(lines) + '\n'
+
+metrics = ProducerMetrics()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith('/metrics.json'):
+            body, content_type = json.dumps(metrics.snapshot()).encode(), 'application/json'
+        elif self.path.startswith('/metrics'):
+            body, content_type = metrics.prometheus().encode(), 'text/plain; version=0.0.4'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of stdout
+
+def start_metrics():
+    """Serve /metrics and /metrics.json, and dump JSON to METRICS_JSON_PATH if set"""
+    if METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer(('0.0.0.0', METRICS_PORT), _MetricsHandler)
+        except OSError as e:  # Port taken: keep producing without the endpoint
+            print(f"⚠️  Metrics endpoint disabled, port {METRICS_PORT}: {e}")
+        else:
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+            print(f"📈 Metrics at http://localhost:{METRICS_PORT}/metrics")
+    if METRICS_JSON_PATH:
+        def dump():
+            while True:
+                time.sleep(METRICS_JSON_INTERVAL)
+                tmp_path = f"{METRICS_JSON_PATH}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(metrics.snapshot(), f, indent=2)
+                os.replace(tmp_path, METRICS_JSON_PATH)
+        threading.Thread(target=dump, name='metrics-dump', daemon=True).start()
+
 # ========================================
 # Producer Functions
 # ========================================
 
+def encode_record(value, headers=None):
+    """Encode value with value_codec (binary formats add their headers); bytes pass through"""
+    if value_codec is None or value is None or isinstance(value, bytes):
+        return value, headers
+    encoded, codec_headers = value_codec.encode(value)
+    return encoded, (headers or []) + codec_headers
+
+def send_record(topic, value=None, key=None, headers=None, partition=None):
+    """producer.send() with value_codec encoding and delivery metrics"""
+    value, headers = encode_record(value, headers)
+    metrics.record_enqueued()
+    started = time.perf_counter()
+    try:
+        future = producer.send(topic, value=value, key=key, headers=headers, partition=partition)
+    except Exception as e:  # Serialization errors, buffer full past max_block_ms
+        metrics.record_delivery(topic, started, e)
+        raise
+    return future.add_both(metrics.record_delivery, topic, started)
+
 def produce_message(topic, key, value):
     """Send a single message"""
     try:
-        future = producer.send(
+        future = send_record(
             topic,
             key=key,
             value=value,
@@ -82,29 +486,191 @@ def produce_message_async(topic, key, value):
     def on_send_error(excp):
         print(f"❌ Error sending message: {excp}")
 
-    producer.send(topic, key=key, value=value) \\
-        .add_callback(on_send_success) \\
+    send_record(topic, key=key, value=value) \
+        .add_callback(on_send_success) \
         .add_errback(on_send_error)
 
-def produce_batch(topic, messages):
-    """Send multiple messages in a batch"""
+class SendWindow:
+    """
+    Pipelined sends with a bounded window of unacknowledged records.
+
+    send() returns as soon as the record is queued, so linger_ms/batch_size
+    can actually fill batches. It only blocks when `max_in_flight` records
+    are outstanding (waiting on the oldest) or when buffer_memory is full
+    (inside producer.send, up to max_block_ms). Delivery results are
+    collected in bulk; each failure goes to on_error(topic, key, error).
+    """
+
+    def __init__(self, max_in_flight=SEND_WINDOW, on_error=None, timeout=SEND_TIMEOUT):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.on_error = on_error or self.print_error
+        self.pending = deque()  # (future, topic, key), oldest first
+        self.delivered = 0
+        self.failed = 0
+
+    @staticmethod
+    def print_error(topic, key, error):
+        print(f"❌ Delivery failed ({topic}, key={key}): {error}")
+
+    def send(self, topic, value=None, key=None, headers=None, partition=None):
+        self.collect()
+        while len(self.pending) >= self.max_in_flight:
+            self._settle(*self.pending.popleft())
+        future = send_record(topic, value=value, key=key, headers=headers, partition=partition)
+        self.pending.append((future, topic, key))
+        return future
+
+    def collect(self):
+        """Settle records that are already acknowledged, without blocking"""
+        while self.pending and self.pending[0][0].is_done:
+            self._settle(*self.pending.popleft())
+
+    def _settle(self, future, topic, key):
+        try:
+            future.get(timeout=self.timeout)
+            self.delivered += 1
+        except KafkaError as e:
+            self.failed += 1
+            self.on_error(topic, key, e)
+
+    def drain(self):
+        """Flush and settle every outstanding record; returns (delivered, failed)"""
+        producer.flush()
+        while self.pending:
+            self._settle(*self.pending.popleft())
+        return self.delivered, self.failed
+
+def produce_batch(topic, messages, window=None):
+    """Send multiple messages through a pipelined send window"""
+    window = window or SendWindow()
     try:
         for msg in messages:
-            producer.send(
+            window.send(
                 topic,
                 key=msg['key'],
                 value=msg['value'],
                 headers=[('source', b'my-app')]
             )
 
-        # Flush to ensure all messages are sent
-        producer.flush()
-        print(f"✅ {len(messages)} messages sent")
+        # Flush and collect every delivery result
+        delivered, failed = window.drain()
+        print(f"✅ {delivered} messages sent" + (f", ❌ {failed} failed" if failed else ""))
+        return delivered, failed
 
     except KafkaError as e:
         print(f"❌ Error producing batch: {e}")
         raise
 
+# ========================================
+# Streaming Ingestion
+# ========================================
+
+def produce_stream(topic, records, window=None, checkpoint_every=CHECKPOINT_EVERY,
+                   progress_every=PROGRESS_EVERY):
+    """
+    Send (key, value) pairs from any iterable - generators included - in
+    constant memory. bytes values are sent without re-encoding. Every
+    `checkpoint_every` records the producer is flushed and all outstanding
+    deliveries are settled, so failures surface while the stream runs.
+    """
+    window = window or SendWindow()
+    started = last_report = time.monotonic()
+    count = size = 0
+
+    def report(label):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        print(f"{label} {count:,} records, {size / 1e6:,.1f} MB raw "
+              f"({count / elapsed:,.0f} rec/s) | delivered {window.delivered:,}, failed {window.failed:,}")
+
+    for key, value in records:
+        window.send(topic, value=value, key=key, headers=[('source', b'my-app')])
+        count += 1
+        if isinstance(value, bytes):
+            size += len(value)
+        if checkpoint_every and count % checkpoint_every == 0:
+            window.drain()
+        if count & 1023 == 0:  # Reading the clock per record costs more than the send
+            now = time.monotonic()
+            if now - last_report >= progress_every:
+                last_report = now
+                report("📤")
+
+    window.drain()
+    report("✅")
+    return window.delivered, window.failed
+
+def read_ndjson(path, key_field=None):
+    """
+    Yield (key, line bytes) from an NDJSON file through mmap ('-' reads
+    stdin in buffered chunks). Lines are only decoded when key_field is
+    set, and even then the original bytes are what gets sent. Lines that
+    are not JSON objects then have no key field: they are skipped and
+    counted, and the first BAD_LINES_REPORTED are reported by number.
+    """
+    if not key_field:
+        for _, line in ndjson_lines(path):
+            yield None, line
+        return
+
+    skipped = 0
+    for number, line in ndjson_lines(path):
+        try:
+            key = json_loads(line).get(key_field)
+        except (ValueError, AttributeError) as e:  # Invalid JSON / valid JSON that is not an object
+            skipped += 1
+            if skipped <= BAD_LINES_REPORTED:
+                reason = 'not a JSON object' if isinstance(e, AttributeError) else f'invalid JSON ({e})'
+                print(f"⚠️  Line {number}: {reason}, skipped")
+            continue
+        yield (None if key is None else str(key)), line
+    if skipped:
+        print(f"⚠️  Skipped {skipped:,} lines that are not JSON objects (no {key_field!r} to key by)")
+
+def ndjson_lines(path):
+    """Yield (line number, stripped line bytes) for the non-blank lines of path ('-' for stdin)"""
+    if path == '-':
+        lines = io.open(sys.stdin.fileno(), 'rb', buffering=READ_BUFFER, closefd=False)
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if line:
+                yield number, line
+        return
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos, end, number = 0, len(mm), 0
+            while pos < end:
+                newline = mm.find(b'\n', pos)
+                if newline == -1:
+                    newline = end
+                line = mm[pos:newline].strip()
+                pos = newline + 1
+                number += 1
+                if line:
+                    yield number, line
+
+def read_csv(path, key_field=None):
+    """Yield (key, JSON-encoded row) from a CSV file with a header row"""
+    if path == '-':
+        f = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    else:
+        f = open(path, 'r', encoding='utf-8', newline='', buffering=READ_BUFFER)
+    with f:
+        for row in csv.DictReader(f):
+            yield (row.get(key_field) if key_field else None), json.dumps(row).encode('utf-8')
+
+def ingest_file(path, topic, fmt=None, key_field=None, window_size=SEND_WINDOW,
+                checkpoint_every=CHECKPOINT_EVERY):
+    """Stream an NDJSON or CSV file (format from the extension by default) into topic"""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    reader = read_csv if fmt == 'csv' else read_ndjson
+    print(f"📡 Ingesting {path} ({fmt}) into {topic}")
+    return produce_stream(topic, reader(path, key_field), SendWindow(max_in_flight=window_size),
+                          checkpoint_every=checkpoint_every)
+
 # ========================================
 # Main Function
 # ========================================
@@ -139,9 +705,23 @@ def main():
 
     # Ensure all messages are sent
     producer.flush()
+    print_partition_report()
 
     print("👋 Producer disconnected")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Kafka producer example and bulk file ingestion')
+    parser.add_argument('--ingest', metavar='FILE',
+                        help="NDJSON or CSV file to produce ('-' for stdin); omit to run the examples")
+    parser.add_argument('--topic', default='my-topic', help='Target topic (default: my-topic)')
+    parser.add_argument('--format', choices=('ndjson', 'csv'), help='Input format (default: from extension)')
+    parser.add_argument('--key-field', help='Field to use as the record key')
+    parser.add_argument('--window', type=int, default=SEND_WINDOW,
+                        help=f'Unacknowledged records in flight (default: {SEND_WINDOW})')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help=f'Records between flush checkpoints (default: {CHECKPOINT_EVERY})')
+    return parser.parse_args()
+
 # ========================================
 # Graceful Shutdown
 # ========================================
@@ -160,7 +740,14 @@ signal.signal(signal.SIGTERM, signal_handler)
 # ========================================
 
 if __name__ == '__main__':
+    args = parse_args()
+    start_metrics()
     try:
+        if args.ingest:
+            delivered, failed = ingest_file(args.ingest, args.topic, args.format, args.key_field,
+                                            args.window, args.checkpoint_every)
+            producer.close()
+            sys.exit(1 if failed else 0)
         main()
     except Exception as e:
         print(f"Error: {e}")
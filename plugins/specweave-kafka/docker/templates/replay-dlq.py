@@ -0,0 +1,411 @@
+"""
+Dead Letter Queue Replay (Python)
+
+Reads the DLQ written by consumer-python.py (send_to_dlq) and re-publishes
+the original messages to their original topic - or --to-topic - through
+the producer template's pipelined SendWindow, rate limited by a token
+bucket.
+
+- Filters: --error-class (the error-type header, no value decoding),
+  --error-match (regex on error_message), --since / --until (failed_at).
+- Bounded: only records present when the replay starts are read, so
+  messages that fail again and land back in the DLQ are not replayed in
+  a loop.
+- Checkpointed: progress is committed to the --group consumer group, but
+  only after every record before it has been acknowledged by the target
+  topic. An interrupted replay resumes from the last checkpoint
+  (at-least-once: records after it may be published twice). Checkpoints
+  also move past records a filter skipped, so without --group each
+  filter gets its own group and a differently filtered run still sees them.
+
+Usage:
+    python replay-dlq.py --dry-run                              # What would be replayed, by error type
+    python replay-dlq.py --error-class TimeoutError --rate 2000
+    python replay-dlq.py --since 2025-01-10T08:00 --until 2025-01-10T09:30
+    python replay-dlq.py --to-topic my-topic-retry --error-match 'connection (reset|refused)'
+
+Local testing without a cluster:
+    KAFKA_LOCAL_BROKER=1 python replay-dlq.py --dry-run
+"""
+
+import os
+
+if os.environ.get('KAFKA_LOCAL_BROKER'):
+    # In-process stand-in with the same client APIs (see local_broker.py)
+    from local_broker import KafkaConsumer, OffsetAndMetadata, ConsumerRebalanceListener
+else:
+    from kafka import KafkaConsumer, OffsetAndMetadata, ConsumerRebalanceListener
+
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+import argparse
+import hashlib
+import importlib.util
+import json
+import re
+import signal
+import sys
+import threading
+import time
+
+try:
+    import orjson  # Optional: pip install orjson (much faster decoding)
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# ========================================
+# Configuration
+# ========================================
+
+DLQ_TOPIC = 'my-topic-dlq'
+REPLAY_GROUP = 'my-app-dlq-replay'  # Checkpoints are this group's committed offsets
+REPLAY_RATE = 1000              # Re-published messages/sec (0 = unlimited)
+CHECKPOINT_EVERY = 50000        # Records between flush + offset commit
+POLL_RECORDS = 2000             # Records per poll
+TIMESTAMP_SLACK_MS = 60000      # Broker timestamp vs failed_at tolerance for the time prefilter
+REPLAY_HEADER = 'dlq-replayed-from'
+CODEC_HEADERS = ('content-type', 'schema-id')  # Re-added by the producer's value_codec for decoded values
+
+TEMPLATES = Path(__file__).resolve().parent
+
+# ========================================
+# Rate Limiting
+# ========================================
+
+class TokenBucket:
+    """`rate` tokens per second, up to `burst` saved for catching up after a pause"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.perf_counter()
+
+    def acquire(self, n=1):
+        """Block until n tokens are available, then take them"""
+        if not self.rate:
+            return
+        while True:
+            now = time.perf_counter()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            time.sleep((n - self.tokens) / self.rate)
+
+# ========================================
+# Filtering
+# ========================================
+
+def parse_time(value):
+    """Epoch milliseconds from epoch ms/seconds or an ISO-8601 string (local time unless it has an offset)"""
+    if value is None:
+        return None
+    if re.fullmatch(r'\d+(\.\d+)?', value):
+        number = float(value)
+        return int(number if number > 1e11 else number * 1000)  # Seconds vs milliseconds
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+def header(record, name):
+    for key, value in record.headers or ():
+        if key == name:
+            return value.decode('utf-8', errors='replace')
+    return None
+
+class ReplayFilter:
+    """
+    Decides which DLQ records to replay, as cheaply as possible: the
+    error-type header and broker timestamp rule most records out before
+    the value is decoded.
+    """
+
+    def __init__(self, error_classes=None, error_pattern=None, since=None, until=None):
+        self.error_classes = set(error_classes or ())
+        self.error_pattern = re.compile(error_pattern) if error_pattern else None
+        self.since = since
+        self.until = until
+
+    def prefilter(self, record):
+        """False when the record can be skipped without decoding it"""
+        if self.since is not None and record.timestamp < self.since - TIMESTAMP_SLACK_MS:
+            return False
+        if self.until is not None and record.timestamp > self.until + TIMESTAMP_SLACK_MS:
+            return False
+        if self.error_classes:
+            error_type = header(record, 'error-type')
+            if error_type is not None and error_type not in self.error_classes:
+                return False
+        return True
+
+    def matches(self, entry):
+        """Exact check on the decoded DLQ entry"""
+        failed_at = entry.get('failed_at', 0)
+        if self.since is not None and failed_at < self.since:
+            return False
+        if self.until is not None and failed_at > self.until:
+            return False
+        if self.error_classes and entry.get('error_type') not in self.error_classes:
+            return False  # Entries written before error_type existed only match without --error-class
+        if self.error_pattern and not self.error_pattern.search(entry.get('error_message', '')):
+            return False
+        return True
+
+# ========================================
+# Replay
+# ========================================
+
+def offset_and_metadata(offset):
+    """OffsetAndMetadata across kafka-python versions (2.1+ adds leader_epoch)"""
+    try:
+        return OffsetAndMetadata(offset, None)
+    except TypeError:
+        return OffsetAndMetadata(offset, None, -1)
+
+def load_producer_template():
+    """producer-python.py as a module: its configured producer, SendWindow and metrics"""
+    spec = importlib.util.spec_from_file_location('producer_template', TEMPLATES / 'producer-python.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def original_value(entry):
+    """The value to re-publish: decoded payloads are re-encoded, undecodable text is sent as it was"""
+    value = entry.get('original_value')
+    # Entries written before original_value_undecodable existed only stored text when decoding failed
+    if isinstance(value, str) and entry.get('original_value_undecodable', True):
+        return value.encode('utf-8')
+    return value  # A JSON string stays a str, so the producer's serializer quotes it again
+
+def original_headers(entry, value, origin):
+    """The original headers (so event-type dispatch still works), plus where the replay came from"""
+    stored = entry.get('original_headers')
+    if stored is None:  # Written before headers were kept
+        return [('source', b'my-app'), (REPLAY_HEADER, origin)]
+    passthrough = value is None or isinstance(value, bytes)  # Not re-encoded: its content-type still applies
+    headers = [(key, header_value.encode('utf-8') if header_value is not None else None)
+               for key, header_value in stored
+               if key != REPLAY_HEADER and (passthrough or key not in CODEC_HEADERS)]
+    return headers + [(REPLAY_HEADER, origin)]
+
+class DlqReplay(ConsumerRebalanceListener):
+    """
+    One pass over the DLQ as it was when the replay started: each
+    partition's end offset is snapshotted when it is first assigned,
+    before any of its records are read, and reading stops there.
+    """
+
+    def __init__(self, consumer, producer_template, replay_filter, rate_limiter, to_topic=None,
+                 dry_run=False, checkpoint_every=CHECKPOINT_EVERY, max_records=None):
+        self.consumer = consumer
+        self.pt = producer_template
+        self.filter = replay_filter
+        self.limiter = rate_limiter
+        self.to_topic = to_topic
+        self.dry_run = dry_run
+        self.checkpoint_every = checkpoint_every
+        self.max_records = max_records
+        self.window = None if dry_run else producer_template.SendWindow()
+        self.stop = threading.Event()
+        self.end_offsets = {}         # TopicPartition -> DLQ end offset when first assigned
+        self.malformed = 0
+        self.read = self.replayed = self.since_checkpoint = 0
+        self.by_error = Counter()
+        self.by_topic = Counter()
+
+    def on_partitions_assigned(self, assigned):
+        new = [tp for tp in assigned if tp not in self.end_offsets]
+        if new:
+            self.end_offsets.update(self.consumer.end_offsets(new))
+
+    def on_partitions_revoked(self, revoked):
+        if revoked:
+            self.checkpoint()
+
+    def caught_up(self):
+        """True once every assigned partition is read up to its starting end offset"""
+        assignment = self.consumer.assignment()
+        if not assignment:
+            return False
+        return all(self.consumer.position(tp) >= self.end_offsets[tp] for tp in assignment)
+
+    def committable(self, tp):
+        # Records fetched past the snapshot were skipped, not replayed: never commit beyond it
+        return min(self.consumer.position(tp), self.end_offsets.get(tp, 0))
+
+    def checkpoint(self):
+        """Settle every outstanding send, then commit the DLQ position. Returns False on failures."""
+        if self.dry_run:
+            return True
+        failed_before = self.window.failed
+        self.window.drain()
+        if self.window.failed > failed_before:
+            print(f"❌ {self.window.failed - failed_before} re-publishes failed; "
+                  f"not checkpointing past them (rerun resumes from the last checkpoint)")
+            return False
+        self.consumer.commit({tp: offset_and_metadata(self.committable(tp))
+                              for tp in self.consumer.assignment()})
+        self.since_checkpoint = 0
+        return True
+
+    def replay_record(self, tp, record):
+        if record.offset >= self.end_offsets[tp]:
+            # Arrived after the replay started (possibly a replayed record failing again)
+            self.consumer.pause(tp)
+            return False
+        self.read += 1
+        if not self.filter.prefilter(record):
+            return True
+        try:
+            entry = json_loads(record.value)
+        except ValueError:
+            entry = None
+        if not isinstance(entry, dict) or not isinstance(entry.get('original_topic'), str):
+            self.malformed += 1
+            self.by_error['<undecodable DLQ entry>'] += 1
+            return True
+        if not self.filter.matches(entry):
+            return True
+
+        topic = self.to_topic or entry['original_topic']
+        self.by_error[entry.get('error_type') or '<unknown>'] += 1
+        self.by_topic[topic] += 1
+        self.replayed += 1
+        if self.dry_run:
+            return True
+
+        self.limiter.acquire()
+        origin = f"{record.topic}/{record.partition}/{record.offset}".encode()
+        value = original_value(entry)
+        self.window.send(topic, value=value, key=entry.get('original_key'),
+                         headers=original_headers(entry, value, origin))
+        self.since_checkpoint += 1
+        return True
+
+    def run(self, progress_every=5):
+        started = last_report = time.monotonic()
+
+        def report(label):
+            elapsed = max(time.monotonic() - started, 1e-9)
+            sent = f" | delivered {self.window.delivered:,}, failed {self.window.failed:,}" if self.window else ""
+            print(f"{label} read {self.read:,} ({self.read / elapsed:,.0f}/s), "
+                  f"{'matched' if self.dry_run else 'replayed'} {self.replayed:,}{sent}")
+
+        ok = True
+        while not self.stop.is_set():
+            batch = self.consumer.poll(timeout_ms=1000, max_records=POLL_RECORDS)
+            for tp, records in batch.items():
+                for record in records:
+                    if not self.replay_record(tp, record):
+                        break  # Rest of this partition's batch is past the snapshot
+            if self.checkpoint_every and self.since_checkpoint >= self.checkpoint_every:
+                ok = self.checkpoint()
+                if not ok:
+                    break
+            if self.max_records and self.replayed >= self.max_records:
+                break
+            if self.caught_up():
+                break
+            now = time.monotonic()
+            if now - last_report >= progress_every:
+                last_report = now
+                report("🔁")
+
+        if ok:
+            ok = self.checkpoint()
+        report("✅" if ok else "⚠️ ")
+        return ok
+
+# ========================================
+# Main Function
+# ========================================
+
+def replay_group(args):
+    """--group, else REPLAY_GROUP, suffixed per filter so filtered runs never share checkpoints"""
+    if args.group:
+        return args.group
+    filters = {
+        'error_class': sorted(args.error_class or ()),
+        'error_match': args.error_match,
+        'since': parse_time(args.since),
+        'until': parse_time(args.until),
+    }
+    if not any(filters.values()):
+        return REPLAY_GROUP
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{REPLAY_GROUP}-{digest}"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Re-publish dead letter queue messages to their original topic')
+    parser.add_argument('--dlq', default=DLQ_TOPIC, help=f'DLQ topic (default: {DLQ_TOPIC})')
+    parser.add_argument('--group',
+                        help=f'Consumer group holding the replay checkpoint (default: {REPLAY_GROUP}, '
+                             f'with a suffix derived from the filters when any are set)')
+    parser.add_argument('--to-topic', help='Publish here instead of each original topic (e.g. a retry topic)')
+    parser.add_argument('--error-class', action='append',
+                        help='Only this error type, e.g. TimeoutError (repeatable)')
+    parser.add_argument('--error-match', help='Only errors whose message matches this regex')
+    parser.add_argument('--since', help='Only failures at/after this time (ISO-8601 or epoch)')
+    parser.add_argument('--until', help='Only failures at/before this time (ISO-8601 or epoch)')
+    parser.add_argument('--rate', type=float, default=REPLAY_RATE,
+                        help=f'Messages/sec to re-publish, 0 = unlimited (default: {REPLAY_RATE})')
+    parser.add_argument('--burst', type=float, help='Token bucket size (default: one second of --rate)')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help=f'Replayed records between checkpoints (default: {CHECKPOINT_EVERY})')
+    parser.add_argument('--max-records', type=int, help='Stop after replaying this many')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count what would be replayed; nothing is sent or checkpointed')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    replay_filter = ReplayFilter(args.error_class, args.error_match,
+                                 parse_time(args.since), parse_time(args.until))
+    group = replay_group(args)
+    if not args.dry_run:
+        print(f"📌 Checkpoints in consumer group {group}")
+
+    consumer = KafkaConsumer(
+        bootstrap_servers=['localhost:9092'],
+        client_id='my-app-dlq-replay',
+        group_id=group,
+        key_deserializer=lambda k: k.decode('utf-8') if k else None,
+        auto_offset_reset='earliest',
+        enable_auto_commit=False,  # Offsets are committed only at checkpoints
+        max_poll_records=POLL_RECORDS,
+        fetch_max_bytes=52428800,
+        max_partition_fetch_bytes=10485760,
+    )
+    producer_template = None if args.dry_run else load_producer_template()
+    replay = DlqReplay(consumer, producer_template, replay_filter, TokenBucket(args.rate, args.burst),
+                       to_topic=args.to_topic, dry_run=args.dry_run,
+                       checkpoint_every=args.checkpoint_every, max_records=args.max_records)
+    # The replay is its own rebalance listener: end offsets are snapshotted on assignment
+    consumer.subscribe([args.dlq], listener=replay)
+
+    def signal_handler(sig, frame):
+        print('\n🛑 Stopping replay after the current batch...')
+        replay.stop.set()
+
+    # Replaces the producer template's handlers: stop cleanly so the last checkpoint is written
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    ok = replay.run()
+    if replay.by_error:
+        print("\nBy error type:")
+        for error_type, count in replay.by_error.most_common():
+            print(f"  {error_type:<40} {count:>10,}")
+        print("By target topic:")
+        for topic, count in replay.by_topic.most_common():
+            print(f"  {topic:<40} {count:>10,}")
+
+    consumer.close()
+    if producer_template:
+        producer_template.producer.close()
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,615 @@
+"""
+Compact Value Serializers (Python)
+
+Pluggable value formats for the Python templates, smaller and cheaper to
+encode/decode than JSON:
+
+- msgpack: schemaless binary (pip install msgpack)
+- avro:    Avro binary encoding driven by a record schema; field names
+           are not repeated in every message, only the schema id is sent
+
+The format travels in a `content-type` header and, for avro, the schema
+id in a `schema-id` header. Records without headers are read as JSON, so
+consumers can read topics while producers migrate.
+
+Usage:
+    from serializers import LocalSchemaRegistry, ValueCodec
+    registry = LocalSchemaRegistry('schema-registry.db')
+    codec = ValueCodec('avro', registry, 'my-topic-value', schema)
+    value_bytes, headers = codec.encode({'event': 'order_created', ...})
+    value = codec.decode(value_bytes, headers)
+
+Bench (bytes/message and encode/decode cost per format):
+    python serializers.py --bench
+    python serializers.py --bench --sample events.ndjson
+
+LocalSchemaRegistry is a SQLite-backed stand-in for a schema registry
+service: ids are assigned on first registration and stable afterwards.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sqlite3
+import struct
+import threading
+import time
+
+try:
+    import orjson  # Optional: pip install orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # Optional: pip install msgpack
+except ImportError:
+    msgpack = None
+
+CONTENT_TYPE_HEADER = 'content-type'
+SCHEMA_ID_HEADER = 'schema-id'
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'msgpack': 'application/x-msgpack',
+    'avro': 'avro/binary',
+}
+
+# ========================================
+# Serializers
+# ========================================
+
+class JsonSerializer:
+    """Compact JSON, through orjson when it is installed"""
+
+    def __init__(self, use_orjson=True):
+        fast = use_orjson and orjson is not None
+        self.name = 'json (orjson)' if fast else 'json'
+        self.serialize = orjson.dumps if fast else self._dumps
+        self.deserialize = orjson.loads if fast else json.loads
+
+    @staticmethod
+    def _dumps(value):
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+class MsgpackSerializer:
+    name = 'msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack format requires msgpack: pip install msgpack")
+        self._packer = msgpack.Packer(use_bin_type=True)
+
+    def serialize(self, value):
+        return self._packer.pack(value)
+
+    def deserialize(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+# Avro binary encoding: zigzag varints for int/long, little-endian IEEE
+# floats, length-prefixed bytes/strings, block-encoded arrays and maps, and
+# a branch index before union values. The schema is compiled once into
+# nested closures, so encoding does no per-message schema interpretation.
+
+_MISSING = object()
+_FLOAT = struct.Struct('<f')
+_DOUBLE = struct.Struct('<d')
+
+def _write_long(out, n):
+    if -64 <= n < 64:  # Single byte, the common case for lengths and union indexes
+        out.append((n << 1) ^ (n >> 63))
+        return
+    n = (n << 1) ^ (n >> 63)
+    while n & ~0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _read_long(buf, pos):
+    b = buf[pos]
+    pos += 1
+    if b < 0x80:
+        return (b >> 1) ^ -(b & 1), pos
+    n = b & 0x7F
+    shift = 7
+    while b & 0x80:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        shift += 7
+    return (n >> 1) ^ -(n & 1), pos
+
+def _type_name(schema):
+    return schema if isinstance(schema, str) else ('union' if isinstance(schema, list) else schema['type'])
+
+def _matches(schema, value):
+    """Whether value can be written with this (union branch) schema"""
+    kind = _type_name(schema)
+    if kind == 'null':
+        return value is None
+    if kind == 'boolean':
+        return isinstance(value, bool)
+    if kind in ('int', 'long'):
+        return isinstance(value, int) and not isinstance(value, bool)
+    if kind in ('float', 'double'):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind == 'string':
+        return isinstance(value, str)
+    if kind == 'bytes':
+        return isinstance(value, (bytes, bytearray))
+    if kind == 'array':
+        return isinstance(value, list)
+    return isinstance(value, dict)  # map, record
+
+def _compile_writer(schema):
+    kind = _type_name(schema)
+
+    if kind == 'null':
+        return lambda out, value: None
+    if kind == 'boolean':
+        return lambda out, value: out.append(1 if value else 0)
+    if kind in ('int', 'long'):
+        return _write_long
+    if kind == 'float':
+        return lambda out, value: out.extend(_FLOAT.pack(value))
+    if kind == 'double':
+        return lambda out, value: out.extend(_DOUBLE.pack(value))
+    if kind == 'string':
+        def write_string(out, value):
+            data = value.encode('utf-8')
+            _write_long(out, len(data))
+            out += data
+        return write_string
+    if kind == 'bytes':
+        def write_bytes(out, value):
+            _write_long(out, len(value))
+            out += value
+        return write_bytes
+
+    if kind == 'array':
+        write_item = _compile_writer(schema['items'])
+
+        def write_array(out, value):
+            if value:
+                _write_long(out, len(value))
+                for item in value:
+                    write_item(out, item)
+            out.append(0)
+        return write_array
+
+    if kind == 'map':
+        write_value = _compile_writer(schema['values'])
+
+        def write_map(out, value):
+            if value:
+                _write_long(out, len(value))
+                for key, item in value.items():
+                    data = key.encode('utf-8')
+                    _write_long(out, len(data))
+                    out.extend(data)
+                    write_value(out, item)
+            out.append(0)
+        return write_map
+
+    if kind == 'union':
+        if len(schema) == 2 and 'null' in schema:  # Optional field: skip branch matching
+            null_index = schema.index('null')
+            write_value = _compile_writer(schema[1 - null_index])
+            null_byte, value_byte = null_index << 1, (1 - null_index) << 1
+
+            def write_optional(out, value):
+                if value is None:
+                    out.append(null_byte)
+                else:
+                    out.append(value_byte)
+                    write_value(out, value)
+            return write_optional
+
+        branches = [(index, branch, _compile_writer(branch)) for index, branch in enumerate(schema)]
+
+        def write_union(out, value):
+            for index, branch, write in branches:
+                if _matches(branch, value):
+                    _write_long(out, index)
+                    write(out, value)
+                    return
+            raise ValueError(f"{value!r} matches no branch of union {schema}")
+        return write_union
+
+    if kind == 'record':
+        fields = [(field['name'], 'default' in field, field.get('default'), _compile_writer(field['type']))
+                  for field in schema['fields']]
+
+        def write_record(out, value):
+            get = value.get
+            for name, has_default, default, write in fields:
+                field_value = get(name, _MISSING)
+                if field_value is _MISSING:
+                    if not has_default:
+                        raise ValueError(f"Missing field {name!r} for record {schema.get('name')}")
+                    field_value = default
+                write(out, field_value)
+        return write_record
+
+    raise ValueError(f"Unsupported schema type: {kind}")
+
+def _compile_reader(schema):
+    kind = _type_name(schema)
+
+    if kind == 'null':
+        return lambda buf, pos: (None, pos)
+    if kind == 'boolean':
+        return lambda buf, pos: (buf[pos] == 1, pos + 1)
+    if kind in ('int', 'long'):
+        return _read_long
+    if kind == 'float':
+        return lambda buf, pos: (_FLOAT.unpack_from(buf, pos)[0], pos + 4)
+    if kind == 'double':
+        return lambda buf, pos: (_DOUBLE.unpack_from(buf, pos)[0], pos + 8)
+    if kind == 'string':
+        def read_string(buf, pos):
+            size = buf[pos]
+            if size < 0x80:
+                size >>= 1
+                pos += 1
+            else:
+                size, pos = _read_long(buf, pos)
+            end = pos + size
+            return buf[pos:end].decode('utf-8'), end
+        return read_string
+    if kind == 'bytes':
+        def read_bytes(buf, pos):
+            size, pos = _read_long(buf, pos)
+            return bytes(buf[pos:pos + size]), pos + size
+        return read_bytes
+
+    if kind in ('array', 'map'):
+        read_item = _compile_reader(schema['items'] if kind == 'array' else schema['values'])
+        read_key = _compile_reader('string')
+
+        def read_blocks(buf, pos):
+            items = [] if kind == 'array' else {}
+            while True:
+                count, pos = _read_long(buf, pos)
+                if count == 0:
+                    return items, pos
+                if count < 0:  # Negative count: block size in bytes follows
+                    count = -count
+                    _, pos = _read_long(buf, pos)
+                for _ in range(count):
+                    if kind == 'array':
+                        item, pos = read_item(buf, pos)
+                        items.append(item)
+                    else:
+                        key, pos = read_key(buf, pos)
+                        items[key], pos = read_item(buf, pos)
+        return read_blocks
+
+    if kind == 'union':
+        if len(schema) == 2 and 'null' in schema:
+            null_byte = schema.index('null') << 1
+            read_value = _compile_reader(schema[1 - schema.index('null')])
+
+            def read_optional(buf, pos):
+                if buf[pos] == null_byte:
+                    return None, pos + 1
+                return read_value(buf, pos + 1)
+            return read_optional
+
+        branches = [_compile_reader(branch) for branch in schema]
+
+        def read_union(buf, pos):
+            index, pos = _read_long(buf, pos)
+            return branches[index](buf, pos)
+        return read_union
+
+    if kind == 'record':
+        fields = [(field['name'], _compile_reader(field['type'])) for field in schema['fields']]
+
+        def read_record(buf, pos):
+            record = {}
+            for name, read in fields:
+                record[name], pos = read(buf, pos)
+            return record, pos
+        return read_record
+
+    raise ValueError(f"Unsupported schema type: {kind}")
+
+class AvroSerializer:
+    """
+    Avro binary encoding for a record schema (null, boolean, int, long,
+    float, double, string, bytes, array, map, record and unions). Keys not
+    in the schema are not written, as with any Avro writer.
+    """
+
+    name = 'avro'
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._write = _compile_writer(schema)
+        self._read = _compile_reader(schema)
+
+    def serialize(self, value):
+        out = bytearray()
+        self._write(out, value)
+        return bytes(out)
+
+    def deserialize(self, data):
+        return self._read(bytes(data), 0)[0]
+
+def infer_schema(samples, name='Value'):
+    """
+    Avro record schema covering every sample dict. Fields missing from
+    some samples, or seen with None, become ["null", T] unions with a
+    null default (T = string when no sample has a value); ints mixed with
+    floats widen to double.
+    """
+    def type_of(values, field_name):
+        present = [v for v in values if v is not None]
+        kinds = set()
+        for v in present:
+            if isinstance(v, bool):
+                kinds.add('boolean')
+            elif isinstance(v, int):
+                kinds.add('long')
+            elif isinstance(v, float):
+                kinds.add('double')
+            elif isinstance(v, str):
+                kinds.add('string')
+            elif isinstance(v, (bytes, bytearray)):
+                kinds.add('bytes')
+            elif isinstance(v, list):
+                kinds.add('array')
+            elif isinstance(v, dict):
+                kinds.add('record')
+        if kinds == {'long', 'double'}:
+            kinds = {'double'}
+
+        branches = []
+        for kind in sorted(kinds):
+            if kind == 'array':
+                items = [item for v in present if isinstance(v, list) for item in v]
+                branches.append({'type': 'array', 'items': type_of(items, field_name) if items else 'string'})
+            elif kind == 'record':
+                branches.append(record_of([v for v in present if isinstance(v, dict)],
+                                          field_name[:1].upper() + field_name[1:]))
+            else:
+                branches.append(kind)
+        if not branches:
+            # Only ever None / missing: nothing to infer from, so accept a string later
+            return ['null', 'string']
+        if len(present) < len(values):
+            branches.insert(0, 'null')
+        return branches[0] if len(branches) == 1 else branches
+
+    def record_of(records, record_name):
+        names = []
+        for record in records:
+            names.extend(k for k in record if k not in names)
+        fields = []
+        for field_name in names:
+            field_type = type_of([r.get(field_name) for r in records], field_name)
+            field = {'name': field_name, 'type': field_type}
+            if isinstance(field_type, list) and field_type[0] == 'null':
+                field['default'] = None
+            fields.append(field)
+        return {'type': 'record', 'name': record_name, 'fields': fields}
+
+    return record_of(list(samples), name)
+
+# ========================================
+# Schema Registry Stand-in
+# ========================================
+
+class LocalSchemaRegistry:
+    """
+    Schemas in a SQLite file, keyed by subject and a fingerprint of their
+    canonical JSON. Registering the same schema again returns its existing
+    id. Lookups are cached, and the connection is shared by worker threads.
+    """
+
+    def __init__(self, path='schema-registry.db'):
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS schemas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                subject TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                schema TEXT NOT NULL,
+                UNIQUE (subject, fingerprint)
+            )
+        ''')
+        self._lock = threading.Lock()
+        self._by_id = {}
+
+    def register(self, subject, schema):
+        canonical = json.dumps(schema, sort_keys=True, separators=(',', ':'))
+        fingerprint = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO schemas (subject, fingerprint, schema) VALUES (?, ?, ?)',
+                (subject, fingerprint, canonical))
+            (schema_id,) = self.conn.execute(
+                'SELECT id FROM schemas WHERE subject = ? AND fingerprint = ?',
+                (subject, fingerprint)).fetchone()
+        return schema_id
+
+    def get(self, schema_id):
+        schema = self._by_id.get(schema_id)
+        if schema is None:
+            with self._lock:
+                row = self.conn.execute('SELECT schema FROM schemas WHERE id = ?', (schema_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown schema id {schema_id}")
+            schema = self._by_id[schema_id] = json.loads(row[0])
+        return schema
+
+    def latest(self, subject):
+        """(id, schema) most recently registered under subject, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT id FROM schemas WHERE subject = ? ORDER BY id DESC LIMIT 1', (subject,)).fetchone()
+        return (row[0], self.get(row[0])) if row else None
+
+    def close(self):
+        self.conn.close()
+
+# ========================================
+# Codec
+# ========================================
+
+def _header(headers, name):
+    for key, value in headers or ():
+        if key == name:
+            return value.decode('utf-8') if isinstance(value, bytes) else value
+    return None
+
+class ValueCodec:
+    """
+    Producer side: encode(value) -> (bytes, headers) in the configured format.
+    Consumer side: decode(data, headers) picks the format from the headers,
+    so one codec reads JSON, msgpack and any registered avro schema.
+    """
+
+    def __init__(self, fmt='json', registry=None, subject=None, schema=None):
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Unknown value format {fmt!r} (expected one of {', '.join(CONTENT_TYPES)})")
+        self.registry = registry
+        self._json = JsonSerializer()
+        self._msgpack = None
+        self._avro = {}  # schema id -> AvroSerializer
+
+        if fmt == 'avro':
+            if registry is None or subject is None or schema is None:
+                raise ValueError("avro format needs a registry, subject and schema")
+            schema_id = registry.register(subject, schema)
+            self.writer = self._avro[schema_id] = AvroSerializer(schema)
+            self.headers = [(CONTENT_TYPE_HEADER, CONTENT_TYPES[fmt].encode()),
+                            (SCHEMA_ID_HEADER, str(schema_id).encode())]
+        else:
+            self.writer = self._json if fmt == 'json' else self._msgpack_serializer()
+            self.headers = [(CONTENT_TYPE_HEADER, CONTENT_TYPES[fmt].encode())]
+
+    def _msgpack_serializer(self):
+        if self._msgpack is None:
+            self._msgpack = MsgpackSerializer()
+        return self._msgpack
+
+    def encode(self, value):
+        return self.writer.serialize(value), self.headers
+
+    def decode(self, data, headers):
+        content_type = _header(headers, CONTENT_TYPE_HEADER)
+        if content_type is None or content_type == CONTENT_TYPES['json']:
+            return self._json.deserialize(data)
+        if content_type == CONTENT_TYPES['msgpack']:
+            return self._msgpack_serializer().deserialize(data)
+        if content_type == CONTENT_TYPES['avro']:
+            schema_id = int(_header(headers, SCHEMA_ID_HEADER))
+            reader = self._avro.get(schema_id)
+            if reader is None:
+                if self.registry is None:
+                    raise ValueError("avro record received but the codec has no schema registry")
+                reader = self._avro[schema_id] = AvroSerializer(self.registry.get(schema_id))
+            return reader.deserialize(data)
+        raise ValueError(f"Unsupported content-type {content_type!r}")
+
+# ========================================
+# Bench
+# ========================================
+
+def synthesize_events(count, seed=42):
+    """Order and login events shaped like the templates' examples"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        if rng.random() < 0.5:
+            events.append({
+                'event': 'order_created',
+                'orderId': f"order-{i}",
+                'userId': f"user-{rng.randrange(10000)}",
+                'amount': round(rng.uniform(1, 500), 2),
+                'currency': 'USD',
+                'items': [{'sku': f"sku-{rng.randrange(1000)}", 'quantity': rng.randrange(1, 5)}
+                          for _ in range(rng.randrange(1, 4))],
+                'timestamp': 1700000000000 + i,
+            })
+        else:
+            events.append({
+                'event': 'user_login',
+                'userId': f"user-{rng.randrange(10000)}",
+                'timestamp': 1700000000000 + i,
+            })
+    return events
+
+def load_sample(path, count):
+    with open(path, 'r', encoding='utf-8') as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return events[:count]
+
+def same_value(decoded, original):
+    """Round-trip check; avro reads back absent optional fields as None"""
+    if isinstance(original, dict):
+        return (isinstance(decoded, dict) and original.keys() <= decoded.keys()
+                and all(same_value(decoded[k], original[k]) if k in original else decoded[k] is None
+                        for k in decoded))
+    if isinstance(original, list):
+        return (isinstance(decoded, list) and len(decoded) == len(original)
+                and all(same_value(d, o) for d, o in zip(decoded, original)))
+    return decoded == original
+
+def bench(events, repeat=3):
+    """Rows of (format, bytes/msg, encode us/msg, decode us/msg, round-trips ok)"""
+    serializers = [JsonSerializer(use_orjson=False)]
+    if orjson is not None:
+        serializers.append(JsonSerializer())
+    if msgpack is not None:
+        serializers.append(MsgpackSerializer())
+    serializers.append(AvroSerializer(infer_schema(events)))
+
+    rows = []
+    for serializer in serializers:
+        encode_best = decode_best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            encoded = [serializer.serialize(e) for e in events]
+            encode_best = min(encode_best, time.perf_counter() - start)
+            start = time.perf_counter()
+            decoded = [serializer.deserialize(d) for d in encoded]
+            decode_best = min(decode_best, time.perf_counter() - start)
+        size = sum(len(d) for d in encoded) / len(events)
+        ok = all(same_value(d, e) for d, e in zip(decoded, events))
+        rows.append((serializer.name, size, encode_best / len(events) * 1e6,
+                     decode_best / len(events) * 1e6, ok))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare value formats on sample messages')
+    parser.add_argument('--bench', action='store_true', help='Run the format benchmark')
+    parser.add_argument('--sample', help='NDJSON file of real messages (default: synthesized events)')
+    parser.add_argument('--count', type=int, default=20000, help='Messages to encode (default: 20000)')
+    parser.add_argument('--schema', action='store_true', help='Print the schema inferred from the sample')
+    args = parser.parse_args()
+    if not args.bench and not args.schema:
+        parser.error("one of --bench or --schema is required")
+
+    events = load_sample(args.sample, args.count) if args.sample else synthesize_events(args.count)
+
+    if args.schema:
+        print(json.dumps(infer_schema(events), indent=2))
+
+    if args.bench:
+        if msgpack is None:
+            print("(msgpack not installed, skipped: pip install msgpack)")
+        print(f"{len(events)} messages\n")
+        print(f"{'Format':<16} {'bytes/msg':>10} {'vs JSON':>8} {'encode us':>10} {'decode us':>10} {'round-trip':>11}")
+        print("-" * 70)
+        rows = bench(events)
+        json_size = rows[0][1]
+        for name, size, encode_us, decode_us, ok in rows:
+            print(f"{name:<16} {size:>10.1f} {size / json_size:>7.0%} {encode_us:>10.2f} {decode_us:>10.2f} "
+                  f"{'ok' if ok else 'MISMATCH':>11}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Producer Batching and Compression Tuner (Python)
+
+Sweeps compression_type x batch_size x linger_ms for a sample of real
+messages and recommends producer settings for the topic.
+
+For every combination it estimates how full batches get at the given
+message rate (size limit vs linger timeout), then builds batches of that
+many sample messages and compresses them with the real codec to measure:
+
+- compression ratio and bytes on the wire per second
+- compression / decompression CPU per MB
+- batch fill (records per batch, % of batch_size) and requests per second
+- the latency linger adds (worst case: time until the batch closes)
+
+Usage:
+    python tune-producer.py --sample messages.ndjson --rate 20000 --partitions 12
+    python tune-producer.py --max-latency-ms 10 --json > recommendation.json
+
+Install codecs to include them: pip install lz4 zstandard python-snappy
+(gzip is always available). Without --sample, synthesized order/login
+events from serializers.py are used.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+import zlib
+
+try:
+    import lz4.frame  # Optional: pip install lz4
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard  # Optional: pip install zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import snappy  # Optional: pip install python-snappy
+except ImportError:
+    snappy = None
+
+BATCH_SIZES = (16384, 65536, 131072, 262144, 1048576)
+LINGER_MS = (0, 5, 10, 25, 50, 100)
+RECORD_OVERHEAD = 20            # Approximate v2 record framing per message (varints, headers)
+SAMPLE_BYTES_PER_CONFIG = 4 << 20  # Uncompressed bytes compressed per (codec, records) cell
+
+# ========================================
+# Codecs
+# ========================================
+
+def available_codecs():
+    """compression_type -> (compress, decompress), only codecs importable here"""
+    codecs = {
+        'none': (None, None),
+        'gzip': (zlib.compress, zlib.decompress),
+    }
+    if lz4 is not None:
+        codecs['lz4'] = (lz4.frame.compress, lz4.frame.decompress)
+    if zstandard is not None:
+        compressor, decompressor = zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor()
+        codecs['zstd'] = (compressor.compress, decompressor.decompress)
+    if snappy is not None:
+        codecs['snappy'] = (snappy.compress, snappy.decompress)
+    return codecs
+
+# ========================================
+# Batching Model
+# ========================================
+
+def batch_shape(batch_size, linger_ms, avg_record_bytes, partition_rate):
+    """
+    (records per batch, ms until the batch closes) for one partition.
+
+    A batch closes when it reaches batch_size or linger_ms after its first
+    record, whichever comes first. At low rates linger decides; at high
+    rates batch_size does.
+    """
+    by_size = max(1, batch_size // avg_record_bytes)
+    by_linger = 1 + int(partition_rate * linger_ms / 1000)
+    records = min(by_size, by_linger)
+    close_ms = min(linger_ms, records / partition_rate * 1000) if partition_rate else linger_ms
+    return records, close_ms
+
+def measure_codec(compress, decompress, records, values):
+    """(compression ratio, compress s/MB, decompress s/MB) for batches of `records` values"""
+    if compress is None:
+        return 1.0, 0.0, 0.0
+
+    cycle = itertools.cycle(values)
+    raw_total = wire_total = 0
+    compress_seconds = decompress_seconds = 0.0
+    while raw_total < SAMPLE_BYTES_PER_CONFIG:
+        batch = b''.join(next(cycle) for _ in range(records))
+        start = time.perf_counter()
+        compressed = compress(batch)
+        compress_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        decompress(compressed)
+        decompress_seconds += time.perf_counter() - start
+        raw_total += len(batch)
+        wire_total += len(compressed)
+
+    mb = raw_total / 1e6
+    return raw_total / wire_total, compress_seconds / mb, decompress_seconds / mb
+
+def sweep(values, rate, partitions, codecs, batch_sizes=BATCH_SIZES, linger_values=LINGER_MS):
+    """One result dict per (codec, batch_size, linger_ms)"""
+    avg_record = sum(len(v) for v in values) // len(values) + RECORD_OVERHEAD
+    partition_rate = rate / partitions
+    raw_mb_per_second = rate * avg_record / 1e6
+    measured = {}  # (codec, records) -> codec measurements, shared across configs
+
+    results = []
+    for codec, (compress, decompress) in codecs.items():
+        for batch_size, linger_ms in itertools.product(batch_sizes, linger_values):
+            records, close_ms = batch_shape(batch_size, linger_ms, avg_record, partition_rate)
+            if (codec, records) not in measured:
+                measured[codec, records] = measure_codec(compress, decompress, records, values)
+            ratio, compress_s_per_mb, decompress_s_per_mb = measured[codec, records]
+            results.append({
+                'compression_type': codec,
+                'batch_size': batch_size,
+                'linger_ms': linger_ms,
+                'records_per_batch': records,
+                'batch_fill': min(1.0, records * avg_record / batch_size),
+                'compression_ratio': ratio,
+                'wire_mb_per_second': raw_mb_per_second / ratio,
+                'requests_per_second': rate / records,
+                'compress_ms_per_mb': compress_s_per_mb * 1000,
+                'decompress_ms_per_mb': decompress_s_per_mb * 1000,
+                'producer_cpu_cores': compress_s_per_mb * raw_mb_per_second,
+                'added_latency_ms': close_ms,
+            })
+    return results
+
+def recommend(results, max_latency_ms, max_cpu_cores):
+    """
+    Fewest wire bytes within the latency and CPU budgets; among configs
+    within 2% of that, the fewest requests, then the least CPU.
+    """
+    eligible = [r for r in results
+                if r['added_latency_ms'] <= max_latency_ms and r['producer_cpu_cores'] <= max_cpu_cores]
+    if not eligible:
+        return None
+    best_wire = min(r['wire_mb_per_second'] for r in eligible)
+    close = [r for r in eligible if r['wire_mb_per_second'] <= best_wire * 1.02]
+    return min(close, key=lambda r: (r['requests_per_second'], r['producer_cpu_cores'], r['batch_size']))
+
+# ========================================
+# Main Function
+# ========================================
+
+def load_values(path, count):
+    """Raw message values: one NDJSON line each, or synthesized JSON events"""
+    if path:
+        with open(path, 'rb') as f:
+            values = [line.strip() for line in itertools.islice(f, count) if line.strip()]
+    else:
+        from serializers import synthesize_events
+        values = [json.dumps(e, separators=(',', ':')).encode('utf-8') for e in synthesize_events(count)]
+    if not values:
+        sys.exit(f"No messages in {path}")
+    return values
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Recommend compression_type, batch_size and linger_ms')
+    parser.add_argument('--sample', help='NDJSON file of real messages (default: synthesized events)')
+    parser.add_argument('--count', type=int, default=20000, help='Sample messages to use (default: 20000)')
+    parser.add_argument('--rate', type=float, default=10000, help='Messages/sec produced to the topic (default: 10000)')
+    parser.add_argument('--partitions', type=int, default=6, help='Topic partitions (default: 6)')
+    parser.add_argument('--max-latency-ms', type=float, default=25,
+                        help='Largest latency linger may add (default: 25)')
+    parser.add_argument('--max-cpu', type=float, default=0.5,
+                        help='Compression CPU budget in cores at --rate (default: 0.5)')
+    parser.add_argument('--top', type=int, default=15, help='Configs to list (default: 15)')
+    parser.add_argument('--json', action='store_true', help='Print results and recommendation as JSON')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    values = load_values(args.sample, args.count)
+    codecs = available_codecs()
+    results = sweep(values, args.rate, args.partitions, codecs)
+    best = recommend(results, args.max_latency_ms, args.max_cpu)
+
+    if args.json:
+        print(json.dumps({'recommended': best, 'results': results}, indent=2))
+        return
+
+    missing = [c for c in ('lz4', 'zstd', 'snappy') if c not in codecs]
+    if missing:
+        print(f"(not installed, skipped: {', '.join(missing)})")
+    avg = sum(len(v) for v in values) / len(values)
+    print(f"{len(values)} sample messages, {avg:.0f} bytes avg, {args.rate:,.0f} msg/s over "
+          f"{args.partitions} partitions\n")
+
+    print(f"{'codec':<7} {'batch':>8} {'linger':>6} {'rec/batch':>9} {'fill':>5} {'ratio':>6} "
+          f"{'wire MB/s':>9} {'req/s':>8} {'comp ms/MB':>10} {'cores':>6} {'+lat ms':>7}")
+    print("-" * 94)
+    def over_budget(r):
+        return r['added_latency_ms'] > args.max_latency_ms or r['producer_cpu_cores'] > args.max_cpu
+
+    ranked = sorted(results, key=lambda r: (over_budget(r), r['wire_mb_per_second'],
+                                            r['requests_per_second'], r['batch_size'], r['linger_ms']))
+    # Configs that end up with the same batches behave identically: show the smallest settings
+    shown, seen = [], set()
+    for r in ranked:
+        outcome = (r['compression_type'], r['records_per_batch'])
+        if outcome not in seen:
+            seen.add(outcome)
+            shown.append(r)
+    for r in shown[:args.top]:
+        print(f"{r['compression_type']:<7} {r['batch_size']:>8} {r['linger_ms']:>6} "
+              f"{r['records_per_batch']:>9} {r['batch_fill']:>5.0%} {r['compression_ratio']:>6.2f} "
+              f"{r['wire_mb_per_second']:>9.2f} {r['requests_per_second']:>8.0f} "
+              f"{r['compress_ms_per_mb']:>10.2f} {r['producer_cpu_cores']:>6.3f} {r['added_latency_ms']:>7.1f}"
+              f"{'  over budget' if over_budget(r) else ''}")
+
+    if best is None:
+        print(f"\nNo configuration fits {args.max_latency_ms} ms added latency and {args.max_cpu} cores")
+        return
+    print(f"\nRecommended (<= {args.max_latency_ms} ms added latency, <= {args.max_cpu} cores):\n")
+    print("producer = KafkaProducer(")
+    print(f"    compression_type={best['compression_type']!r}," if best['compression_type'] != 'none'
+          else "    compression_type=None,")
+    print(f"    batch_size={best['batch_size']},")
+    print(f"    linger_ms={best['linger_ms']},")
+    print(")")
+    print(f"\n# {best['compression_ratio']:.1f}x compression, {best['records_per_batch']} records/batch, "
+          f"{best['requests_per_second']:.0f} requests/s, {best['wire_mb_per_second']:.2f} MB/s on the wire")
+
+if __name__ == '__main__':
+    main()
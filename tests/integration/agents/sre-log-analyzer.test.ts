@@ -0,0 +1,77 @@
+/**
+ * Integration Tests: SRE log-analyzer.py
+ *
+ * Runs the script against small fixture logs and checks the report.
+ *
+ * Critical tests:
+ * 1. A chained Python traceback (blank lines around "During handling of
+ *    the above exception...") is one ERROR event, not several
+ * 2. Its fingerprint groups by the root cause (first exception in the chain)
+ *
+ * @group integration
+ * @group agents
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'fs-extra';
+import path from 'path';
+import os from 'os';
+import { execFileSync } from 'child_process';
+import { findProjectRoot } from '../../test-utils/project-root.js';
+
+// ✅ SAFE: Find project root from test file location, not process.cwd()
+const projectRoot = findProjectRoot(import.meta.url);
+const scriptPath = path.join(projectRoot, 'plugins/specweave-infrastructure/agents/sre/scripts/log-analyzer.py');
+
+const CHAINED_TRACEBACK = `2025-10-26 14:00:00 INFO starting
+2025-10-26 14:00:01 ERROR Job failed
+Traceback (most recent call last):
+  File "/app/jobs.py", line 10, in load
+    return cache[key]
+KeyError: 'user-42'
+
+During handling of the above exception, another exception occurred:
+
+Traceback (most recent call last):
+  File "/app/jobs.py", line 14, in run
+    value = load(key)
+  File "/app/jobs.py", line 12, in load
+    raise ValueError("bad")
+ValueError: bad
+2025-10-26 14:00:02 INFO done
+`;
+
+describe('log-analyzer.py', () => {
+  let testRoot: string;
+
+  beforeEach(async () => {
+    testRoot = path.join(os.tmpdir(), `log-analyzer-test-${Date.now()}-${Math.random().toString(36).substring(7)}`);
+    await fs.ensureDir(testRoot);
+  });
+
+  afterEach(async () => {
+    await fs.remove(testRoot);
+  });
+
+  function analyze(log: string, ...args: string[]): string {
+    const logPath = path.join(testRoot, 'app.log');
+    fs.writeFileSync(logPath, log);
+    return execFileSync('python3', [scriptPath, logPath, ...args], { encoding: 'utf-8' });
+  }
+
+  it('counts a chained traceback as one error event', () => {
+    const output = analyze(CHAINED_TRACEBACK);
+
+    expect(output).toContain('Total lines: 16');
+    expect(output).toContain('Errors: 1\n');
+    expect(output).toContain('Stack traces: 1 (1 distinct root causes)');
+    expect(output).not.toMatch(/^1\s+ValueError: bad$/m);
+  });
+
+  it('fingerprints the chain by its root cause', () => {
+    const output = analyze(CHAINED_TRACEBACK);
+
+    expect(output).toMatch(/^1\s+[0-9a-f]{12}\s+KeyError: 'user-42'$/m);
+    expect(output).toContain('at jobs.py:load');
+  });
+});